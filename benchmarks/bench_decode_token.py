@@ -0,0 +1,52 @@
+"""
+Chi phí decode_token khi có và không có cache JWT đã verify.
+
+Chạy: python -m benchmarks.bench_decode_token [--iterations 50000] [--tokens 1]
+
+--tokens > 1 quay vòng qua nhiều token khác nhau (mô phỏng nhiều user, cache vẫn hit
+khi số token không vượt VERIFIED_TOKEN_CACHE_MAX_SIZE).
+"""
+
+import argparse
+import os
+import time
+
+os.makedirs("logs", exist_ok=True)
+
+from jose import jwt  # noqa: E402
+
+from src.cores import auth  # noqa: E402
+from src.cores.config import settings  # noqa: E402
+from src.cores.token_cache import verified_token_cache  # noqa: E402
+
+
+def decode_uncached(token: str):
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+def measure(decode, tokens: list[str], iterations: int) -> float:
+    for token in tokens:  # warm up (và nạp cache)
+        decode(token)
+    start = time.perf_counter()
+    for i in range(iterations):
+        decode(tokens[i % len(tokens)])
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--tokens", type=int, default=1)
+    args = parser.parse_args()
+
+    tokens = [auth.create_access_token(username=f"bench{i}", role="user") for i in range(args.tokens)]
+    verified_token_cache.clear()
+
+    uncached = measure(decode_uncached, tokens, args.iterations)
+    cached = measure(auth.decode_token, tokens, args.iterations)
+    print(f"jwt.decode            {uncached:>8.2f}us/op")
+    print(f"decode_token (cached) {cached:>8.2f}us/op   x{uncached / cached:.1f}   hits={verified_token_cache.hits} misses={verified_token_cache.misses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Thông lượng login (bcrypt) và độ trễ của các route đọc chạy cùng lúc, khi bcrypt chạy
+trực tiếp trong threadpool của AnyIO so với khi chạy trong HashingExecutor.
+
+Chạy: python -m benchmarks.bench_login [--seconds 10] [--logins 100] [--readers 20] [--rounds 12]
+
+--rounds đo thông lượng login với một cost bcrypt khác BCRYPT_ROUNDS hiện tại.
+
+Cần DATABASE_URL và SECRET_KEY trong môi trường như khi chạy app; benchmark không
+query DB: /read mô phỏng một truy vấn bằng time.sleep.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.makedirs("logs", exist_ok=True)
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from passlib.hash import bcrypt  # noqa: E402
+
+from src.cores import auth  # noqa: E402
+from src.cores.config import settings  # noqa: E402
+from src.cores.password_hasher import get_password_hasher  # noqa: E402
+
+READ_SECONDS = 0.002  # thời gian một truy vấn đọc giả lập
+
+
+def build_app(inline: bool, rounds: int) -> FastAPI:
+    app = FastAPI()
+    hashed = bcrypt.using(rounds=rounds).hash("bench-password")
+
+    @app.get("/login")
+    def login():
+        if inline:
+            ok = auth.pwd_context.verify("bench-password", hashed)
+        else:
+            ok = auth.verify_password("bench-password", hashed)
+        return JSONResponse({"ok": ok})
+
+    @app.get("/read")
+    def read():
+        time.sleep(READ_SECONDS)
+        return JSONResponse({"ok": True})
+
+    return app
+
+
+async def call(app, path: str) -> tuple[int, float]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+    status = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status.get("code", 500), time.perf_counter() - start
+
+
+async def run(app, seconds: float, logins: int, readers: int):
+    deadline = time.perf_counter() + seconds
+    login_ok, login_busy, read_latencies = [0], [0], []
+
+    async def login_worker():
+        while time.perf_counter() < deadline:
+            code, _ = await call(app, "/login")
+            if code == 200:
+                login_ok[0] += 1
+            else:
+                login_busy[0] += 1
+                await asyncio.sleep(0.01)  # client lùi lại khi nhận 503
+
+    async def read_worker():
+        while time.perf_counter() < deadline:
+            _, latency = await call(app, "/read")
+            read_latencies.append(latency)
+
+    await asyncio.gather(*(login_worker() for _ in range(logins)), *(read_worker() for _ in range(readers)))
+    return {
+        "login_per_s": login_ok[0] / seconds,
+        "login_503": login_busy[0],
+        "read_per_s": len(read_latencies) / seconds,
+        "read_p99_ms": statistics.quantiles(read_latencies, n=100)[98] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--logins", type=int, default=100, help="số client login đồng thời")
+    parser.add_argument("--readers", type=int, default=20, help="số client gọi route đọc đồng thời")
+    parser.add_argument("--rounds", type=int, default=settings.BCRYPT_ROUNDS, help="cost bcrypt của hash được kiểm tra")
+    args = parser.parse_args()
+
+    print(f"bcrypt rounds={args.rounds}, hashing executor: {get_password_hasher().snapshot()}")
+    for name, inline in (("inline bcrypt", True), ("hashing executor", False)):
+        result = asyncio.run(run(build_app(inline, args.rounds), args.seconds, args.logins, args.readers))
+        print(f"{name:<18} login={result['login_per_s']:>7.1f}/s  503={result['login_503']:<6} read={result['read_per_s']:>8.1f}/s  read p99={result['read_p99_ms']:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
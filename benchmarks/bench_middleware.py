@@ -0,0 +1,132 @@
+"""
+So sánh overhead của stack middleware cũ (BaseHTTPMiddleware) và stack ASGI thuần
+trên một endpoint rỗng, gọi app trực tiếp qua ASGI (không qua mạng).
+
+Chạy: python -m benchmarks.bench_middleware [--requests 20000] [--concurrency 50]
+
+Cần DATABASE_URL và SECRET_KEY trong môi trường như khi chạy app; benchmark không
+query DB (request không có Authorization và path được loại khỏi AuthMiddleware).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+os.makedirs("logs", exist_ok=True)
+
+from fastapi import FastAPI, Request  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from src.middlewares.access_log import AccessLogMiddleware  # noqa: E402
+from src.middlewares.auth_middleware import AuthMiddleware  # noqa: E402
+from src.middlewares.rate_limiter import RateLimiterMiddleware  # noqa: E402
+
+PATH = "/bench"
+
+
+# --- Stack cũ: cùng đường đi của dispatch trước khi chuyển sang ASGI thuần ---
+class LegacyAccessLogMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start = time.time()
+        response = await call_next(request)
+        duration_ms = (time.time() - start) * 1000
+        client_host = request.client.host if request.client else "unknown"
+        logging.getLogger("access").info(f"{request.method} {request.url.path} status={response.status_code} duration={duration_ms:.2f}ms client={client_host}")
+        return response
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path in [PATH] or request.method == "OPTIONS":
+            return await call_next(request)
+        raise RuntimeError("benchmark only covers excluded paths")
+
+
+class LegacyRateLimiterMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        auth_header = request.headers.get("Authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return await call_next(request)
+        raise RuntimeError("benchmark only covers unauthenticated requests")
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get(PATH)
+    async def bench():
+        return {"ok": True}
+
+    if legacy:
+        app.add_middleware(LegacyAccessLogMiddleware)
+        app.add_middleware(LegacyAuthMiddleware)
+        app.add_middleware(LegacyRateLimiterMiddleware)
+    else:
+        app.add_middleware(AccessLogMiddleware)
+        app.add_middleware(AuthMiddleware, exclude_paths=[PATH])
+        app.add_middleware(RateLimiterMiddleware, max_requests=10, period_seconds=10)
+    return app
+
+
+async def call(app) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": PATH,
+        "raw_path": PATH.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+async def run(app, total: int, concurrency: int):
+    for _ in range(200):  # warm up
+        await call(app)
+
+    latencies = []
+
+    async def worker(count: int):
+        for _ in range(count):
+            latencies.append(await call(app))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, statistics.quantiles(latencies, n=100)[98] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # Chỉ đo overhead middleware, không đo I/O ghi log
+    logging.getLogger("access").disabled = True
+
+    for name, legacy in (("BaseHTTPMiddleware", True), ("pure ASGI", False)):
+        rps, p99 = asyncio.run(run(build_app(legacy), args.requests, args.concurrency))
+        print(f"{name:<20} {rps:>10.0f} req/s   p99={p99:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
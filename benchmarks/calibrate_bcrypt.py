@@ -0,0 +1,54 @@
+"""
+Đo thời gian băm bcrypt theo từng cost trên máy hiện tại để chọn BCRYPT_ROUNDS.
+
+Chạy: python -m benchmarks.calibrate_bcrypt [--min 10] [--max 14] [--samples 5] [--budget-ms 250]
+
+Cost được đề xuất là cost cao nhất có median thời gian băm không vượt budget. Thời gian
+login còn cộng thêm thời gian xếp hàng trong HashingExecutor khi tải cao, nên budget nên
+nhỏ hơn p99 mục tiêu của /auth/login. Đổi BCRYPT_ROUNDS không làm hỏng hash cũ: user
+được băm lại theo cost mới ở lần login thành công kế tiếp.
+"""
+
+import argparse
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+
+def measure(rounds: int, samples: int) -> list[float]:
+    hasher = bcrypt.using(rounds=rounds)
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibrate-password")
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min", type=int, default=10)
+    parser.add_argument("--max", type=int, default=14)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=250, help="thời gian băm tối đa cho một lần login")
+    args = parser.parse_args()
+
+    recommended = None
+    for rounds in range(args.min, args.max + 1):
+        durations = measure(rounds, args.samples)
+        median = statistics.median(durations)
+        print(f"rounds={rounds:<3} median={median:>9.1f}ms  max={max(durations):>9.1f}ms  ~{1000 / median:>7.1f} hash/s/core")
+        if median <= args.budget_ms:
+            recommended = rounds
+        else:
+            break  # cost tiếp theo chậm gấp đôi, không cần đo
+
+    if recommended is None:
+        print(f"no cost in [{args.min}, {args.max}] fits {args.budget_ms}ms, keep BCRYPT_ROUNDS={args.min} or raise the budget")
+    else:
+        print(f"recommended BCRYPT_ROUNDS={recommended}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
-from typing import Optional
+from typing import Optional, Union
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from starlette.responses import JSONResponse
 
+from src.cores.database import get_pool_stats
 from src.cores.dependencies import get_db
+from src.cores.maintenance import get_maintenance_scheduler
+from src.cores.password_hasher import get_password_hasher
 from src.models.enums import RoleEnum
-from src.schemas.response import PaginatedResponse, StandardResponse
+from src.schemas.response import CursorPaginatedResponse, PaginatedResponse, StandardResponse
 from src.schemas.token_log import TokenLogResponse
 from src.schemas.users import UserReadAdmin
 from src.services.token_log_service import TokenLogService
@@ -24,19 +27,23 @@ def get_token_log_service(db: Session = Depends(get_db)) -> TokenLogService:
     return TokenLogService(db)
 
 
-@router.get("", response_model=PaginatedResponse[UserReadAdmin])
+@router.get("", response_model=Union[PaginatedResponse[UserReadAdmin], CursorPaginatedResponse[UserReadAdmin]])
 def list_users(
     page: int = Query(1, ge=1, description="Trang hiện tại"),
     limit: int = Query(10, ge=1, le=100, description="Số lượng/trang"),
     name: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None, description="Trạng thái người dùng: true = active, false = blocked"),
     role: Optional[RoleEnum] = Query(None, description="Vai trò của người dùng"),
+    cursor: Optional[str] = Query(None, description="Phân trang theo cursor: để trống (?cursor=) cho trang đầu, sau đó dùng next_cursor"),
+    include_total: bool = Query(True, description="false: bỏ qua COUNT, chỉ trả link next"),
     service: UserService = Depends(get_user_service),
 ):
     """
     Lấy danh sách người dùng theo trạng thái.
     """
-    return service.get_all_for_admin(page, limit, name, is_active, role)
+    if cursor is not None:
+        return service.get_all_for_admin_by_cursor(cursor, limit, name, is_active, role)
+    return service.get_all_for_admin(page, limit, name, is_active, role, include_total)
 
 
 @router.get("/users/{user_id}", response_model=StandardResponse)
@@ -83,13 +90,62 @@ def delete_user(user_id: str, service: UserService = Depends(get_user_service)):
 
 
 @router.get("/token", response_model=StandardResponse)
-def get_token_logs(token_service: TokenLogService = Depends(get_token_log_service)):
-    tokens = token_service.get_paginated()
+def get_token_logs(
+    limit: int = Query(200, ge=1, le=1000, description="Số lượng/trang"),
+    cursor: Optional[str] = Query(None, description="Phân trang theo cursor: để trống (?cursor=) cho trang đầu, sau đó dùng next_cursor"),
+    token_service: TokenLogService = Depends(get_token_log_service),
+):
+    if cursor is None:
+        tokens = token_service.get_paginated(limit=limit)
+        return ORJSONResponse(
+            status_code=200,
+            content={
+                "status_code": 200,
+                "message": "success",
+                "data": [TokenLogResponse.model_validate(token).model_dump() for token in tokens],
+            },
+        )
+
+    tokens, next_cursor = token_service.get_page(cursor, limit)
     return ORJSONResponse(
         status_code=200,
         content={
             "status_code": 200,
             "message": "success",
             "data": [TokenLogResponse.model_validate(token).model_dump() for token in tokens],
+            "pagination": {"limit": limit, "next_cursor": next_cursor},
         },
     )
+
+
+@router.get("/db/pool", response_model=StandardResponse)
+def get_db_pool_stats():
+    """
+    Số liệu live của connection pool (checked out, overflow, thời gian chờ) để chọn kích thước pool.
+    """
+    return JSONResponse(
+        status_code=200,
+        content={"status_code": 200, "message": "success", "data": get_pool_stats()},
+    )
+
+
+@router.get("/maintenance", response_model=StandardResponse)
+def get_maintenance_stats():
+    """
+    Trạng thái các việc bảo trì: worker hiện tại có là leader không, thời gian và số dòng xóa lần chạy gần nhất.
+    """
+    return JSONResponse(
+        status_code=200,
+        content={"status_code": 200, "message": "success", "data": get_maintenance_scheduler().snapshot()},
+    )
+
+
+@router.get("/password-hasher", response_model=StandardResponse)
+def get_password_hasher_stats():
+    """
+    Tải của pool băm mật khẩu: số việc đang chạy/xếp hàng, số request bị từ chối (503).
+    """
+    return JSONResponse(
+        status_code=200,
+        content={"status_code": 200, "message": "success", "data": get_password_hasher().snapshot()},
+    )
@@ -1,4 +1,3 @@
-from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
@@ -11,8 +10,6 @@ from src.cores.dependencies import get_db
 from src.models.users import User
 from src.schemas.active_access_tokens import ActiveAccessTokenCreate
 from src.schemas.response import StandardResponse, TokenResponse
-from src.schemas.session import SessionCreate
-from src.schemas.token_log import TokenLogCreate
 from src.schemas.users import UserCreate, UserRead
 from src.services.active_access_token_service import ActiveAccessTokenService
 from src.services.auth_service import AuthService
@@ -38,45 +35,29 @@ def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
-    user_current: Optional[User] = db.query(User).filter(User.username == form_data.username).first()
-    if not user_current or not auth.verify_password(form_data.password, user_current.password):
-        if user_current:
-            safe_log_token_action(db, user_current, "login failed", request)
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-
-    if not user_current.is_active:
-        raise HTTPException(status_code=401, detail="User blocked")
-
-    # Tạo access token và refresh token
-    access_token = auth.create_access_token(username=str(user_current.username), role=user_current.role)
-    generated_refresh_token = auth.create_refresh_token(username=str(user_current.username), role=user_current.role)
-
-    # Lưu access token vào DB
-    save_access_token(db, access_token, user_current.id)
+    # Kiểm tra mật khẩu, lưu access token + session và ghi audit log trong một transaction
+    result = AuthService(db).login(form_data.username, form_data.password, request.client.host, request.headers.get("user-agent"))
 
     # Set refresh token trong cookie HttpOnly
     response.set_cookie(
         key="refresh_token",
-        value=generated_refresh_token,
+        value=result.refresh_token,
         httponly=True,
         secure=True,  # chỉ dùng HTTPS
         samesite="strict",
         max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
     )
 
-    safe_log_token_action(db, user_current, "login", request)
-    log_session(db, generated_refresh_token, request, user_current)
-
     return {
         "status_code": 200,
         "message": "Success",
         "data": {
-            "access_token": access_token,
+            "access_token": result.access_token,
             "token_type": "bearer",
             "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-            "id": user_current.id,
-            "username": user_current.username,
-            "role": user_current.role,
+            "id": result.user_id,
+            "username": result.username,
+            "role": result.role,
         },
     }
 
@@ -152,15 +133,8 @@ def logout_all(
     session_service = SessionService(db)
     session_service.revoke_all_sessions(user.id)
 
-    token_service = ActiveAccessTokenService(db)
-    blacklist_service = BlacklistTokenService(db)
-
-    active_tokens = token_service.get_tokens_by_user_id(user.id)
-    print(active_tokens)
-    for token in active_tokens:
-        blacklist_service.blacklist_token(token.access_token)
-
-    token_service.delete_tokens_by_user_id(user.id)
+    # INSERT ... SELECT vào blacklist + một DELETE, không lặp theo từng token
+    BlacklistTokenService(db).revoke_user_tokens(user.id)
 
     response.delete_cookie("refresh_token")
     return {"status_code": 200, "message": "Logged out from all sessions"}
@@ -176,37 +150,7 @@ def safe_log_token_action(db: Session, user: User, action: str, request: Request
 
 
 def log_token_action(db: Session, user: User, action: str, request: Request):
-    log_service = TokenLogService(db)
-    ip = request.client.host
-    agent = request.headers.get("user-agent")
-
-    log_data = TokenLogCreate(
-        user_id=user.id,
-        username=user.username,
-        ip_address=ip,
-        user_agent=agent,
-        action=action,
-    )
-    log_service.log_token_request(log_data)
-
-    if log_service.is_suspicious(user.id, ip, agent, action):
-        suspicious_log = TokenLogCreate(**{**log_data.model_dump(), "action": f"suspicious {action}"})
-        log_service.log_token_request(suspicious_log)
-
-
-def log_session(db: Session, generated_refresh_token: str, request: Request, user: User):
-    session_service = SessionService(db)
-    session_data = SessionCreate(
-        user_id=user.id,
-        refresh_token=generated_refresh_token,
-        ip_address=request.client.host,
-        user_agent=request.headers.get("user-agent"),
-        expires_at=datetime.now(timezone.utc) + timedelta(days=7),
-    )
-    try:
-        session_service.create_session(session_data)
-    except Exception:
-        raise HTTPException(status_code=401, detail="Session creation failed")
+    TokenLogService(db).log_action(user.id, user.username, request.client.host, request.headers.get("user-agent"), action)
 
 
 def decode_refresh_token_or_raise(token: str) -> str:
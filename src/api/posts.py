@@ -1,11 +1,14 @@
+from typing import Literal, Optional, Union
+
 from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette.responses import JSONResponse
 
-from src.cores.dependencies import get_db
-from src.schemas.posts import PostCreate, PostRead, PostUpdate
-from src.schemas.response import ErrorResponse, PaginatedResponse, StandardResponse
-from src.services.post_service import PostService
+from src.cores.dependencies import get_async_db, get_db
+from src.schemas.posts import PostCreate, PostRead, PostSearchResult, PostUpdate
+from src.schemas.response import CursorPaginatedResponse, ErrorResponse, PaginatedResponse, StandardResponse
+from src.services.post_service import AsyncPostService, PostService
 
 router = APIRouter()
 
@@ -14,13 +17,35 @@ def get_post_service(db: Session = Depends(get_db)) -> PostService:
     return PostService(db)
 
 
-@router.get("/", response_model=PaginatedResponse[PostRead])
+def get_async_post_service(db: AsyncSession = Depends(get_async_db)) -> AsyncPostService:
+    return AsyncPostService(db)
+
+
+@router.get("/", response_model=Union[PaginatedResponse[PostRead], CursorPaginatedResponse[PostRead]])
 def get_all_posts(
     page: int = Query(1, ge=1, description="Trang hiện tại"),
     limit: int = Query(10, ge=1, le=100, description="Số lượng/trang"),
+    cursor: Optional[str] = Query(None, description="Phân trang theo cursor: để trống (?cursor=) cho trang đầu, sau đó dùng next_cursor"),
+    include_total: bool = Query(True, description="false: bỏ qua COUNT, chỉ trả link next"),
+    service: PostService = Depends(get_post_service),
+):
+    if cursor is not None:
+        return service.get_all_by_cursor(cursor, limit, True)
+    return service.get_all(page, limit, True, include_total)
+
+
+@router.get("/search", response_model=CursorPaginatedResponse[PostSearchResult])
+def search_posts(
+    q: str = Query(..., min_length=1, max_length=255, description="Từ khóa tìm trong title/content"),
+    mode: Literal["natural", "boolean"] = Query("natural", description="boolean: hỗ trợ +từ, -từ, từ*"),
+    order: Literal["relevance", "recent"] = Query("relevance", description="Sắp xếp theo điểm hoặc bài mới nhất"),
+    category_id: Optional[str] = Query(None, description="Lọc theo category"),
+    user_id: Optional[str] = Query(None, description="Lọc theo tác giả"),
+    cursor: str = Query("", description="Để trống cho trang đầu, sau đó dùng next_cursor"),
+    limit: int = Query(10, ge=1, le=100, description="Số lượng/trang"),
     service: PostService = Depends(get_post_service),
 ):
-    return service.get_all(page, limit, True)
+    return service.search(q, cursor, limit, mode, order, category_id, user_id)
 
 
 @router.get(
@@ -30,9 +55,9 @@ def get_all_posts(
         400: {"model": ErrorResponse, "description": "Bad request"},
     },
 )
-def get_my_posts(request: Request, service: PostService = Depends(get_post_service)):
+async def get_my_posts(request: Request, service: AsyncPostService = Depends(get_async_post_service)):
     current_user = request.state.user
-    posts = service.get_posts_by_user_id(current_user.id)
+    posts = await service.get_posts_by_user_id(current_user.id)
     return JSONResponse(
         status_code=200,
         content={
@@ -52,8 +77,8 @@ def get_my_posts(request: Request, service: PostService = Depends(get_post_servi
         404: {"model": ErrorResponse, "description": "Not found"},
     },
 )
-def get_posts_by_user(user_id: str, service: PostService = Depends(get_post_service)):
-    posts = service.get_posts_by_user_id(user_id)
+async def get_posts_by_user(user_id: str, service: AsyncPostService = Depends(get_async_post_service)):
+    posts = await service.get_posts_by_user_id(user_id)
     return JSONResponse(
         status_code=200,
         content={
@@ -94,8 +119,8 @@ def update_post(
 
 
 @router.get("/{post_id}", response_model=StandardResponse)
-def get_post(post_id: str, service: PostService = Depends(get_post_service)):
-    post = service.get_post_by_id(post_id)
+async def get_post(post_id: str, service: AsyncPostService = Depends(get_async_post_service)):
+    post = await service.get_post_by_id(post_id)
     return JSONResponse(
         status_code=200,
         content={
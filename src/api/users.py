@@ -1,9 +1,11 @@
+from typing import Optional, Union
+
 from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 from starlette.responses import JSONResponse
 
 from src.cores.dependencies import get_db
-from src.schemas.response import PaginatedResponse, StandardResponse
+from src.schemas.response import CursorPaginatedResponse, PaginatedResponse, StandardResponse
 from src.schemas.users import PasswordChangeRequest, UserRead, UserUpdateRequest
 from src.services.user_service import UserService
 
@@ -15,13 +17,17 @@ def get_user_service(db: Session = Depends(get_db)) -> UserService:
     return UserService(db)
 
 
-@router.get("/", response_model=PaginatedResponse[UserRead])
+@router.get("/", response_model=Union[PaginatedResponse[UserRead], CursorPaginatedResponse[UserRead]])
 def list_active_users(
     page: int = Query(1, ge=1, description="Trang hiện tại"),
     limit: int = Query(10, ge=1, le=100, description="Số lượng/trang"),
+    cursor: Optional[str] = Query(None, description="Phân trang theo cursor: để trống (?cursor=) cho trang đầu, sau đó dùng next_cursor"),
+    include_total: bool = Query(True, description="false: bỏ qua COUNT, chỉ trả link next"),
     service: UserService = Depends(get_user_service),
 ):
-    return service.get_all(page, limit, True)
+    if cursor is not None:
+        return service.get_all_by_cursor(cursor, limit, True)
+    return service.get_all(page, limit, True, include_total)
 
 
 @router.get("/me", response_model=StandardResponse[UserRead])
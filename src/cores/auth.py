@@ -1,20 +1,33 @@
+import hashlib
+import uuid
 from datetime import UTC, datetime, timedelta
+from typing import Optional
 
 from fastapi import HTTPException
 from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
 
 from src.cores.config import settings
+from src.cores.password_hasher import get_password_hasher
+from src.cores.token_cache import verified_token_cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    # bcrypt chạy trong pool băm riêng để không chiếm threadpool của các route khác
+    return get_password_hasher().run(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password, hashed_password) -> tuple[bool, Optional[str]]:
+    """
+    Như verify_password; nếu đúng mật khẩu mà hash dùng cost khác BCRYPT_ROUNDS thì trả kèm hash mới.
+    """
+    return get_password_hasher().run(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_password_hasher().run(pwd_context.hash, password)
 
 
 def create_token(data: dict, expires_delta: timedelta, token_type: str = "access"):
@@ -25,10 +38,18 @@ def create_token(data: dict, expires_delta: timedelta, token_type: str = "access
         "token_type": token_type,
         "iat": now,
         "exp": now + expires_delta,
+        "jti": uuid.uuid4().hex,
     }
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def token_digest(token: str) -> bytes:
+    """
+    SHA-256 (32 byte) của token, dùng làm khóa tra cứu thay cho chuỗi JWT đầy đủ.
+    """
+    return hashlib.sha256(token.encode()).digest()
+
+
 def create_access_token(username: str, role: str):
     return create_token(
         data={"sub": username, "role": role},
@@ -46,8 +67,17 @@ def create_refresh_token(username: str, role: str):
 
 
 def decode_token(token: str):
+    """
+    Verify JWT và trả về claims. Token đã verify được cache theo digest đến khi hết hạn,
+    nên middleware và các dependency decode cùng token chỉ tốn một lần jwt.decode.
+    """
+    digest = token_digest(token)
+    payload = verified_token_cache.get(digest)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        verified_token_cache.set(digest, payload)
         return payload
     except ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Access token expired")
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from starlette.requests import HTTPConnection
+
+
+@dataclass
+class AuthContext:
+    """
+    Thông tin xác thực của một request, được điền một lần bởi middleware
+    và dùng lại ở các dependency (get_current_user, require_roles).
+    """
+
+    token: Optional[str] = None
+    payload: Optional[dict] = None
+    user: Optional[Any] = None
+
+
+def parse_bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    return authorization.removeprefix("Bearer ")
+
+
+def get_auth_context(request: HTTPConnection) -> AuthContext:
+    """
+    Lấy AuthContext trong request.state, tạo mới (và tách bearer token) nếu chưa có.
+    """
+    context = getattr(request.state, "auth", None)
+    if context is None:
+        context = AuthContext(token=parse_bearer_token(request.headers.get("Authorization")))
+        request.state.auth = context
+    return context
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from src.cores.logger import get_logger
+
+logger = get_logger("buffered_writer")
+
+POLICY_SYNC = "sync"  # hàng đợi đầy: ghi ngay trong request (chậm hơn nhưng không mất dữ liệu)
+POLICY_DROP = "drop"  # hàng đợi đầy: bỏ sự kiện và tăng bộ đếm dropped
+
+
+class BufferedWriter:
+    """
+    Hàng đợi giới hạn trong bộ nhớ, được một task nền flush theo lô (multi-row INSERT)
+    khi đủ batch_size phần tử hoặc sau flush_seconds. Khi chưa start (test, script),
+    submit ghi ngay như trước.
+
+    sink(rows) ghi một lô và được gọi trong threadpool.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[list[dict]], object],
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_seconds: float = 1.0,
+        policy: str = POLICY_SYNC,
+    ):
+        if policy not in (POLICY_SYNC, POLICY_DROP):
+            raise ValueError(f"Unknown queue full policy: {policy}")
+        self.sink = sink
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.policy = policy
+        self._buffer: deque[dict] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def submit(self, row: dict) -> bool:
+        """
+        Thêm một dòng vào hàng đợi (an toàn khi gọi từ threadpool). Trả về False nếu bị bỏ.
+        """
+        if not self.running:
+            self._write([row])
+            return True
+
+        with self._lock:
+            full = len(self._buffer) >= self.max_size
+            if not full:
+                self._buffer.append(row)
+                size = len(self._buffer)
+
+        if full:
+            if self.policy == POLICY_DROP:
+                self.dropped += 1
+                return False
+            self._write([row])
+            return True
+
+        if size >= self.batch_size:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return True
+
+    def _write(self, rows: list[dict]):
+        try:
+            self.sink(rows)
+        except Exception:
+            self.failed += len(rows)
+            logger.exception(f"failed to write {len(rows)} rows")
+        else:
+            self.written += len(rows)
+
+    def flush(self) -> int:
+        """
+        Ghi toàn bộ hàng đợi theo từng lô batch_size. Trả về số dòng đã lấy ra.
+        """
+        total = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    count = min(self.batch_size, len(self._buffer))
+                    rows = [self._buffer.popleft() for _ in range(count)]
+                if not rows:
+                    return total
+                self._write(rows)
+                total += len(rows)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await run_in_threadpool(self.flush)
+
+    def start(self):
+        if self._runner is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Dừng task nền và flush phần còn lại trong hàng đợi.
+        """
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        await run_in_threadpool(self.flush)
+
+    def snapshot(self) -> dict:
+        return {"queued": len(self._buffer), "written": self.written, "dropped": self.dropped, "failed": self.failed}
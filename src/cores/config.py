@@ -15,17 +15,62 @@ class Environment(str, Enum):
 class Settings(BaseSettings):
     DATABASE_URL: MySQLDsn
     SECRET_KEY: str
+    ASYNC_DATABASE_DRIVER: str = "mysql+aiomysql"
+
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # giây chờ connection trước khi báo lỗi
+    DB_POOL_RECYCLE: int = 1800  # nhỏ hơn wait_timeout của MySQL
+    DB_POOL_PRE_PING: bool = True
 
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Phân quyền chỉ dựa trên JWT claims + cache trạng thái user (không query DB mỗi request)
+    AUTH_STATELESS: bool = True
+    USER_STATUS_CACHE_TTL_SECONDS: int = 30
+    USER_STATUS_CACHE_MAX_SIZE: int = 10000
+
+    VERIFIED_TOKEN_CACHE_MAX_SIZE: int = 10000  # 0: tắt cache, luôn verify lại JWT
     BLACKLIST_TOKEN_EXPIRE_MINUTES: int = 30
+    BLACKLIST_BLOOM_CAPACITY: int = 100000
+    BLACKLIST_BLOOM_ERROR_RATE: float = 0.001
+    BLACKLIST_CACHE_MAX_CONFIRMED: int = 10000
+    BLACKLIST_CACHE_SYNC_SECONDS: int = 2  # đồng bộ token do worker khác thu hồi
+    BLACKLIST_CACHE_SYNC_OVERLAP_IDS: int = 1000  # quét lại các id gần last_id: transaction commit trễ có thể mang id nhỏ hơn
     TOKEN_USAGE_LOG_EXPIRE_MINUTES: int = 1
+    CLEANUP_DELETE_BATCH_SIZE: int = 5000  # số dòng tối đa mỗi lượt DELETE của cleanup job
+    CLEANUP_INTERVAL_SECONDS: int = 200
+    SESSION_CLEANUP_INTERVAL_SECONDS: int = 3600
+    MAINTENANCE_JITTER_SECONDS: int = 20
+    MAINTENANCE_LOCK_PATH: Optional[str] = None  # mặc định <tmp>/user_post_maintenance.lock
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+    TOKEN_USAGE_LOG_PARTITIONS_AHEAD: int = 24  # partition theo giờ
+    TOKEN_LOG_PARTITIONS_AHEAD: int = 7  # partition theo ngày
+    TOKEN_LOG_RETENTION_DAYS: int = 90  # chỉ áp dụng khi token_logs đã được partition
+    TOKEN_LOG_QUEUE_MAX_SIZE: int = 10000
+    TOKEN_LOG_BATCH_SIZE: int = 500
+    TOKEN_LOG_FLUSH_SECONDS: float = 1.0
+    TOKEN_LOG_QUEUE_FULL_POLICY: str = "sync"  # "sync" (ghi ngay) | "drop"
     RATE_LIMIT_MAX_REQUESTS: int = 10
     RATE_LIMIT_PERIOD_SECONDS: int = 10
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" | "shared" | "sql"
+    RATE_LIMIT_MAX_TRACKED_TOKENS: int = 10000
+    RATE_LIMIT_SHM_PATH: Optional[str] = None  # mặc định /dev/shm/user_post_rate_limit
     SUSPICIOUS_LOGIN_TIME_WINDOW: int = 300  # 5 minutes in seconds
     SUSPICIOUS_REFRESH_TIME_WINDOW: int = 86400  # 24 hours in seconds
+    TOKEN_LOG_FINGERPRINT_CACHE_TTL_SECONDS: int = 300
+    TOKEN_LOG_FINGERPRINT_CACHE_MAX_SIZE: int = 10000
+    COUNT_CACHE_TTL_SECONDS: int = 30  # tổng số dòng của trang danh sách
+    COUNT_CACHE_MAX_SIZE: int = 1000
+    BCRYPT_ROUNDS: int = 12  # hash cũ khác cost này được băm lại khi login thành công (python -m benchmarks.calibrate_bcrypt)
+    # Mỗi việc băm (chạy hoặc xếp hàng) giữ một thread AnyIO; tổng workers + pending mặc định
+    # chiếm tối đa PASSWORD_HASH_THREADPOOL_SHARE số thread của AnyIO, phần còn lại cho route sync khác
+    PASSWORD_HASH_THREADPOOL_SHARE: float = 0.25
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # mặc định min(số CPU, nửa phần được chia)
+    PASSWORD_HASH_MAX_PENDING: Optional[int] = None  # số việc băm được xếp hàng, quá thì trả 503
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 2.0
 
     SITE_DOMAIN: str = "myapp.com"
     ENVIRONMENT: Environment = Environment.PRODUCTION
@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from src.cores.config import settings
+
+
+class CountCache:
+    """
+    TTL cache cho tổng số dòng của các trang danh sách, khóa theo (namespace, bộ lọc).
+    Repository gọi invalidate(namespace) sau mỗi lần thêm/xóa/đổi trạng thái.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 1000, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, namespace: str, key: Hashable, loader: Callable[[], int]) -> int:
+        cache_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(cache_key)
+                return entry[1]
+
+        value = loader()
+        with self._lock:
+            self._entries[cache_key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(cache_key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *namespaces: str):
+        with self._lock:
+            for cache_key in [key for key in self._entries if key[0] in namespaces]:
+                del self._entries[cache_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache(ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS, max_size=settings.COUNT_CACHE_MAX_SIZE)
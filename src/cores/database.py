@@ -1,9 +1,128 @@
+import threading
+import time
+from typing import Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from src.cores.config import settings
 
-engine = create_engine(str(settings.DATABASE_URL))
+
+class PoolWaitMetrics:
+    """
+    Thống kê thời gian chờ lấy connection từ pool (pool không tự cung cấp số liệu này).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class _TimedCheckoutMixin:
+    wait_metrics: PoolWaitMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_metrics.record(time.perf_counter() - start)
+        return conn
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    wait_metrics = PoolWaitMetrics()
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    wait_metrics = PoolWaitMetrics()
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(str(settings.DATABASE_URL), poolclass=InstrumentedQueuePool, **_pool_options())
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 Base = declarative_base()
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    AsyncEngine dùng chung DATABASE_URL nhưng đổi driver sang ASYNC_DATABASE_DRIVER
+    (mặc định mysql+aiomysql). Tạo lazy để chỉ cần driver async khi thực sự dùng.
+    """
+    global _async_engine
+    if _async_engine is None:
+        url = make_url(str(settings.DATABASE_URL)).set(drivername=settings.ASYNC_DATABASE_DRIVER)
+        _async_engine = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, **_pool_options())
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_session_factory()
+
+
+def _pool_stats(db_engine: Engine) -> dict:
+    pool = db_engine.pool
+    stats = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+    if isinstance(pool, _TimedCheckoutMixin):
+        stats.update(pool.wait_metrics.snapshot())
+    return stats
+
+
+def get_pool_stats() -> dict:
+    """
+    Số liệu live của pool sync và async (nếu async engine đã được tạo).
+    """
+    stats = {"sync": _pool_stats(engine)}
+    if _async_engine is not None:
+        stats["async"] = _pool_stats(_async_engine.sync_engine)
+    return stats
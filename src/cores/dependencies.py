@@ -1,8 +1,10 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
-from src.cores.database import SessionLocal
+from src.cores.auth_context import get_auth_context
+from src.cores.database import AsyncSessionLocal, SessionLocal
+from src.cores.request_session import get_request_sessions
 from src.cores.utils import validate_token_and_get_user
 from src.models.enums import RoleEnum
 from src.models.users import User
@@ -10,7 +12,13 @@ from src.models.users import User
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def get_db():
+def get_db(request: Request = None):
+    # Trong request có DbSessionMiddleware: dùng session của request, middleware sẽ đóng
+    sessions = get_request_sessions(request.state) if request is not None else None
+    if sessions is not None:
+        yield sessions.sync
+        return
+
     db = SessionLocal()
     try:
         yield db
@@ -18,8 +26,25 @@ def get_db():
         db.close()
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    return validate_token_and_get_user(token, db)
+async def get_async_db(request: Request = None):
+    sessions = get_request_sessions(request.state) if request is not None else None
+    if sessions is not None:
+        yield sessions.async_
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    # AuthMiddleware đã giải mã token và nạp user cho request này thì dùng lại
+    context = get_auth_context(request)
+    if context.user is not None and context.token == token:
+        return context.user
+
+    user = validate_token_and_get_user(token, db)
+    context.token, context.user = token, user
+    return user
 
 
 def require_roles(*roles: RoleEnum):
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.cores.config import settings
+
+
+@dataclass(frozen=True)
+class LogFingerprint:
+    ip_address: str
+    user_agent: Optional[str]
+    timestamp: datetime
+
+    @classmethod
+    def from_log(cls, log) -> "LogFingerprint":
+        timestamp = log.timestamp if log.timestamp.tzinfo else log.timestamp.replace(tzinfo=timezone.utc)
+        return cls(ip_address=log.ip_address, user_agent=log.user_agent, timestamp=timestamp)
+
+
+@dataclass(frozen=True)
+class FingerprintEntry:
+    """
+    Fingerprint của log mới nhất (last) và log liền trước nó (previous) cho một user/action.
+    """
+
+    last: LogFingerprint
+    previous: Optional[LogFingerprint]
+
+
+class FingerprintCache:
+    """
+    TTL cache (user_id, action) -> FingerprintEntry, giới hạn số phần tử theo LRU.
+    TokenLogService cập nhật mỗi khi ghi log nên phát hiện bất thường không cần query.
+    TTL giới hạn độ lệch khi worker khác ghi log cho cùng user.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 10000, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str], tuple[float, FingerprintEntry]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, action: str) -> Optional[FingerprintEntry]:
+        key = (user_id, action)
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, user_id: str, action: str, entry: FingerprintEntry):
+        key = (user_id, action)
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, entry)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+fingerprint_cache = FingerprintCache(ttl_seconds=settings.TOKEN_LOG_FINGERPRINT_CACHE_TTL_SECONDS, max_size=settings.TOKEN_LOG_FINGERPRINT_CACHE_MAX_SIZE)
@@ -0,0 +1,183 @@
+import asyncio
+import fcntl
+import os
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from src.cores.config import settings
+from src.cores.database import SessionLocal
+from src.cores.logger import get_logger
+
+logger = get_logger("maintenance")
+
+
+@dataclass
+class MaintenanceTask:
+    """
+    Một việc bảo trì định kỳ; func nhận Session và trả về số dòng đã xóa.
+    """
+
+    name: str
+    func: Callable[[Session], Optional[int]]
+    interval_seconds: float
+    jitter_seconds: float = 0.0
+    next_run_at: float = 0.0
+    runs: int = 0
+    failures: int = 0
+    last_run_at: Optional[float] = None
+    last_duration_ms: Optional[float] = None
+    last_rows_deleted: Optional[int] = None
+    total_rows_deleted: int = 0
+    last_error: Optional[str] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def schedule_next(self, now: float):
+        self.next_run_at = now + self.interval_seconds + random.uniform(0, self.jitter_seconds)
+
+    def record(self, started_at: float, duration: float, rows: Optional[int], error: Optional[str] = None):
+        with self._lock:
+            self.runs += 1
+            self.last_run_at = started_at
+            self.last_duration_ms = round(duration * 1000, 3)
+            self.last_error = error
+            if error is not None:
+                self.failures += 1
+            else:
+                self.last_rows_deleted = rows or 0
+                self.total_rows_deleted += rows or 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "interval_seconds": self.interval_seconds,
+                "runs": self.runs,
+                "failures": self.failures,
+                "last_run_at": self.last_run_at,
+                "last_duration_ms": self.last_duration_ms,
+                "last_rows_deleted": self.last_rows_deleted,
+                "total_rows_deleted": self.total_rows_deleted,
+                "last_error": self.last_error,
+            }
+
+
+class LeaderLock:
+    """
+    Khóa leader giữa các worker trên cùng máy bằng flock trên một file.
+    Worker giữ khóa đến khi dừng; nếu leader chết, kernel nhả khóa và worker khác lấy được.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class MaintenanceScheduler:
+    """
+    Chạy các MaintenanceTask trong threadpool (không chặn event loop), chỉ trên worker
+    đang giữ LeaderLock. Worker khác thử lấy khóa lại sau mỗi poll_seconds.
+    """
+
+    def __init__(self, lock: LeaderLock, poll_seconds: float = 1.0, clock=time.monotonic):
+        self.lock = lock
+        self.poll_seconds = poll_seconds
+        self._clock = clock
+        self._tasks: dict[str, MaintenanceTask] = {}
+        self._runner: Optional[asyncio.Task] = None
+
+    def register(self, task: MaintenanceTask):
+        self._tasks[task.name] = task
+
+    @property
+    def tasks(self) -> list[MaintenanceTask]:
+        return list(self._tasks.values())
+
+    def run_task(self, task: MaintenanceTask):
+        started_at = time.time()
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            rows = task.func(db)
+        except Exception as e:
+            db.rollback()
+            task.record(started_at, time.perf_counter() - start, None, error=str(e))
+            logger.exception(f"{task.name}: failed")
+        else:
+            task.record(started_at, time.perf_counter() - start, rows)
+            logger.info(f"{task.name}: deleted {rows or 0} rows in {task.last_duration_ms}ms")
+        finally:
+            db.close()
+
+    async def run_pending(self):
+        now = self._clock()
+        for task in self.tasks:
+            if task.next_run_at <= now:
+                await run_in_threadpool(self.run_task, task)
+                task.schedule_next(self._clock())
+
+    async def _loop(self):
+        while True:
+            if self.lock.try_acquire():
+                await self.run_pending()
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self):
+        if self._runner is None:
+            now = self._clock()
+            for task in self.tasks:
+                # Lần chạy đầu cũng có jitter để các task không dồn vào cùng thời điểm
+                task.next_run_at = now + random.uniform(0, task.jitter_seconds)
+            self._runner = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        self.lock.release()
+
+    def snapshot(self) -> dict:
+        return {"is_leader": self.lock.is_leader, "tasks": [task.snapshot() for task in self.tasks]}
+
+
+_scheduler: Optional[MaintenanceScheduler] = None
+
+
+def get_maintenance_scheduler() -> MaintenanceScheduler:
+    global _scheduler
+    if _scheduler is None:
+        path = settings.MAINTENANCE_LOCK_PATH or os.path.join(tempfile.gettempdir(), "user_post_maintenance.lock")
+        _scheduler = MaintenanceScheduler(LeaderLock(path))
+    return _scheduler
@@ -0,0 +1,145 @@
+"""
+Migration thủ công cho các bảng token (dự án chưa dùng Alembic).
+
+Chạy: python -m src.cores.migrations
+
+Các bước đều idempotent nên có thể chạy lại nhiều lần.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from src.cores.logger import get_logger
+from src.cores.partitions import PARTITIONED_TABLES, is_partitioned, partition_definitions, plan_future_bounds
+
+logger = get_logger("migrations")
+
+# (bảng, cột token gốc, tên unique index mới hoặc None nếu không unique)
+TOKEN_DIGEST_TABLES = [
+    ("blacklisted_tokens", "token", "uq_blacklisted_tokens_token_hash"),
+    ("active_access_tokens", "access_token", "uq_active_access_tokens_token_hash"),
+    ("token_usage_log", "token", None),
+]
+
+
+def migrate_token_digests(engine: Engine):
+    """
+    Thêm cột token_hash BINARY(32), backfill bằng UNHEX(SHA2(token, 256)) (trùng với
+    cores.auth.token_digest), thay các index trên chuỗi JWT bằng index trên digest rồi bỏ
+    cột chuỗi JWT. DB đã chạy bản cũ (cột JWT chỉ chuyển thành NULL) cũng được bỏ cột.
+    """
+    with engine.begin() as conn:
+        for table, source_column, unique_index in TOKEN_DIGEST_TABLES:
+            inspector = inspect(conn)
+            if not inspector.has_table(table):
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table)}
+            if source_column not in columns:
+                continue  # đã migrate xong
+
+            if "token_hash" not in columns:
+                logger.info(f"{table}: add column token_hash")
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN token_hash BINARY(32) NULL"))
+
+            conn.execute(text(f"UPDATE {table} SET token_hash = UNHEX(SHA2({source_column}, 256)) WHERE token_hash IS NULL"))
+
+            # Bỏ các index cũ trên cột chuỗi JWT
+            indexes = inspector.get_indexes(table)
+            for index in indexes:
+                if source_column in index["column_names"]:
+                    logger.info(f"{table}: drop index {index['name']}")
+                    conn.execute(text(f"ALTER TABLE {table} DROP INDEX {index['name']}"))
+
+            if unique_index:
+                if unique_index not in {index["name"] for index in indexes}:
+                    # Giữ lại dòng có id nhỏ nhất cho mỗi digest trước khi tạo unique index
+                    conn.execute(text(f"DELETE a FROM {table} a JOIN {table} b ON a.token_hash = b.token_hash AND a.id > b.id"))
+                    conn.execute(text(f"ALTER TABLE {table} MODIFY token_hash BINARY(32) NOT NULL"))
+                    conn.execute(text(f"CREATE UNIQUE INDEX {unique_index} ON {table} (token_hash)"))
+            else:
+                conn.execute(text(f"ALTER TABLE {table} MODIFY token_hash BINARY(32) NOT NULL"))
+                conn.execute(text(f"CREATE INDEX idx_token_hash_time ON {table} (token_hash, requested_at)"))
+
+            # Chỉ giữ digest: không để chuỗi JWT còn hiệu lực nằm trong DB
+            logger.info(f"{table}: drop column {source_column}")
+            conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {source_column}"))
+
+
+def partition_log_tables(engine: Engine):
+    """
+    Chuyển token_usage_log (theo giờ) và token_logs (theo ngày) sang RANGE COLUMNS partition.
+    MySQL yêu cầu khóa chính chứa cột partition nên PK đổi thành (id, <cột thời gian>);
+    dữ liệu hiện có nằm trong partition đầu tiên và sẽ bị DROP khi hết hạn.
+    """
+    if engine.dialect.name != "mysql":
+        return
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        for spec in PARTITIONED_TABLES:
+            if not inspect(conn).has_table(spec.table) or is_partitioned(conn, spec.table):
+                continue
+            logger.info(f"{spec.table}: partition by {spec.column}")
+            conn.execute(text(f"UPDATE {spec.table} SET {spec.column} = UTC_TIMESTAMP() WHERE {spec.column} IS NULL"))
+            conn.execute(text(f"ALTER TABLE {spec.table} MODIFY {spec.column} DATETIME NOT NULL, DROP PRIMARY KEY, ADD PRIMARY KEY (id, {spec.column})"))
+            bounds = plan_future_bounds(spec, None, now)
+            conn.execute(text(f"ALTER TABLE {spec.table} PARTITION BY RANGE COLUMNS({spec.column}) ({partition_definitions(spec, bounds)})"))
+
+
+def add_token_log_indexes(engine: Engine):
+    """
+    Thay index đơn trên token_logs.user_id bằng index (user_id, action, timestamp).
+    """
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        if not inspector.has_table("token_logs"):
+            return
+        indexes = {index["name"] for index in inspector.get_indexes("token_logs")}
+        if "idx_token_logs_user_action_time" not in indexes:
+            logger.info("token_logs: create index idx_token_logs_user_action_time")
+            conn.execute(text("CREATE INDEX idx_token_logs_user_action_time ON token_logs (user_id, action, timestamp)"))
+        if "ix_token_logs_user_id" in indexes:
+            conn.execute(text("DROP INDEX ix_token_logs_user_id ON token_logs"))
+
+
+# Index cho keyset pagination theo (thời gian tạo, id)
+PAGINATION_INDEXES = [
+    ("posts", "idx_posts_created_at_id", "created_at, id"),
+    ("users", "idx_users_created_at_id", "created_at, id"),
+    ("token_logs", "idx_token_logs_timestamp_id", "timestamp, id"),
+]
+
+
+def add_pagination_indexes(engine: Engine):
+    with engine.begin() as conn:
+        for table, index_name, columns in PAGINATION_INDEXES:
+            inspector = inspect(conn)
+            if not inspector.has_table(table) or index_name in {index["name"] for index in inspector.get_indexes(table)}:
+                continue
+            logger.info(f"{table}: create index {index_name}")
+            conn.execute(text(f"CREATE INDEX {index_name} ON {table} ({columns})"))
+
+
+def add_post_fulltext_index(engine: Engine):
+    """
+    FULLTEXT index trên posts(title, content) cho /api/v1/posts/search (chỉ MySQL).
+    """
+    if engine.dialect.name != "mysql":
+        return
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        if not inspector.has_table("posts") or "ft_posts_title_content" in {index["name"] for index in inspector.get_indexes("posts")}:
+            return
+        logger.info("posts: create fulltext index ft_posts_title_content")
+        conn.execute(text("CREATE FULLTEXT INDEX ft_posts_title_content ON posts (title, content)"))
+
+
+if __name__ == "__main__":
+    from src.cores.database import engine
+
+    migrate_token_digests(engine)
+    partition_log_tables(engine)
+    add_token_log_indexes(engine)
+    add_pagination_indexes(engine)
+    add_post_fulltext_index(engine)
@@ -0,0 +1,61 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, TypeVar, Union
+
+from fastapi import HTTPException
+
+T = TypeVar("T")
+
+Cursor = tuple[Union[datetime, float], Any]  # (created_at hoặc điểm relevance, id); id là str (uuid) hoặc int
+
+
+def encode_cursor(created_at: Union[datetime, float], row_id) -> str:
+    """
+    Cursor mờ (opaque) cho keyset pagination theo (created_at, id), hoặc (điểm, id) khi tìm kiếm.
+    """
+    key = created_at.isoformat() if isinstance(created_at, datetime) else created_at
+    raw = json.dumps([key, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """
+    None hoặc chuỗi rỗng là trang đầu; cursor sai định dạng trả về 400.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key, row_id = json.loads(raw)
+        if isinstance(key, str):
+            return datetime.fromisoformat(key), row_id
+        if isinstance(key, (int, float)) and not isinstance(key, bool):
+            return float(key), row_id
+        raise ValueError(key)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def cursor_page(rows: Sequence[T], limit: int, key: Callable[[T], tuple]) -> tuple[list[T], Optional[str]]:
+    """
+    rows được lấy dư một phần tử (limit + 1) để biết còn trang sau hay không.
+    """
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(*key(items[-1])) if len(rows) > limit else None
+    return items, next_cursor
+
+
+def offset_page(fetch: Callable[[int, int], Sequence[T]], page: int, limit: int, count: Optional[Callable[[], int]] = None):
+    """
+    Phân trang OFFSET/LIMIT. Có count thì tính total và last_page; không có (include_total=false)
+    thì lấy dư một dòng để biết còn trang sau mà không cần COUNT.
+    Trả về (items, total, last_page, has_next); total và last_page là None khi không đếm.
+    """
+    skip = (page - 1) * limit
+    if count is not None:
+        total = count()
+        last_page = (total - 1) // limit + 1
+        return list(fetch(skip, limit)), total, last_page, page < last_page
+    rows = list(fetch(skip, limit + 1))
+    return rows[:limit], None, None, len(rows) > limit
@@ -0,0 +1,139 @@
+"""
+Partition theo thời gian (MySQL RANGE COLUMNS) cho các bảng log ghi nhiều.
+
+Mỗi partition đặt tên theo cận trên: p2026101713 chứa các dòng < 2026-10-17 13:00.
+Luôn có partition cuối pmax (MAXVALUE); partition mới được tách ra từ pmax trước khi
+dữ liệu tới, retention xóa nguyên partition bằng DROP PARTITION thay vì DELETE từng dòng.
+
+Bảng được chuyển sang partition bằng `python -m src.cores.migrations`; trên bảng chưa
+partition (hoặc DB không phải MySQL) các hàm ở đây không làm gì và cleanup dùng DELETE.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import text
+
+from src.cores.config import settings
+from src.cores.logger import get_logger
+
+logger = get_logger("partitions")
+
+MAX_PARTITION = "pmax"
+
+
+@dataclass(frozen=True)
+class PartitionSpec:
+    table: str
+    column: str
+    unit: timedelta  # timedelta(hours=1) hoặc timedelta(days=1)
+    ahead: int  # số partition tạo sẵn phía trước thời điểm hiện tại
+
+    def floor(self, moment: datetime) -> datetime:
+        moment = moment.replace(minute=0, second=0, microsecond=0)
+        if self.unit >= timedelta(days=1):
+            moment = moment.replace(hour=0)
+        return moment
+
+    def name(self, bound: datetime) -> str:
+        return "p" + bound.strftime("%Y%m%d%H" if self.unit < timedelta(days=1) else "%Y%m%d")
+
+
+@dataclass(frozen=True)
+class PartitionInfo:
+    name: str
+    bound: Optional[datetime]  # None với pmax
+    rows: int
+
+
+TOKEN_USAGE_LOG_PARTITIONS = PartitionSpec("token_usage_log", "requested_at", timedelta(hours=1), settings.TOKEN_USAGE_LOG_PARTITIONS_AHEAD)
+TOKEN_LOG_PARTITIONS = PartitionSpec("token_logs", "timestamp", timedelta(days=1), settings.TOKEN_LOG_PARTITIONS_AHEAD)
+PARTITIONED_TABLES = [TOKEN_USAGE_LOG_PARTITIONS, TOKEN_LOG_PARTITIONS]
+
+
+def utc_naive(moment: datetime) -> datetime:
+    # Cột DATETIME lưu giờ UTC không kèm timezone
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def parse_partition_bound(description: Optional[str]) -> Optional[datetime]:
+    if description is None or description == "MAXVALUE":
+        return None
+    return datetime.fromisoformat(description.strip("'"))
+
+
+def plan_future_bounds(spec: PartitionSpec, last_bound: Optional[datetime], now: datetime) -> list[datetime]:
+    """
+    Các cận trên cần thêm để có đủ spec.ahead partition sau thời điểm now.
+    Nếu bị trễ (last_bound đã qua), partition đầu tiên gom cả khoảng trống đến giờ hiện tại.
+    """
+    current = spec.floor(utc_naive(now)) + spec.unit
+    target = current + spec.unit * spec.ahead
+    bound = current if last_bound is None or last_bound < current else last_bound + spec.unit
+    bounds = []
+    while bound <= target:
+        bounds.append(bound)
+        bound += spec.unit
+    return bounds
+
+
+def partition_definitions(spec: PartitionSpec, bounds: list[datetime]) -> str:
+    parts = [f"PARTITION {spec.name(bound)} VALUES LESS THAN ('{bound:%Y-%m-%d %H:%M:%S}')" for bound in bounds]
+    parts.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    return ", ".join(parts)
+
+
+def _dialect_name(db) -> str:
+    dialect = getattr(db, "dialect", None) or db.get_bind().dialect
+    return dialect.name
+
+
+def list_partitions(db, table: str) -> list[PartitionInfo]:
+    if _dialect_name(db) != "mysql":
+        return []
+    rows = db.execute(
+        text(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        ),
+        {"table": table},
+    ).all()
+    return [PartitionInfo(row[0], parse_partition_bound(row[1]), row[2] or 0) for row in rows]
+
+
+def is_partitioned(db, table: str) -> bool:
+    return bool(list_partitions(db, table))
+
+
+def ensure_future_partitions(db, spec: PartitionSpec, now: Optional[datetime] = None) -> int:
+    """
+    Tách pmax thành các partition tương lai còn thiếu. Trả về số partition đã tạo.
+    """
+    partitions = list_partitions(db, spec.table)
+    if not partitions:
+        return 0
+    bounds = [p.bound for p in partitions if p.bound is not None]
+    new_bounds = plan_future_bounds(spec, max(bounds, default=None), now or datetime.now(timezone.utc))
+    if new_bounds:
+        db.execute(text(f"ALTER TABLE {spec.table} REORGANIZE PARTITION {MAX_PARTITION} INTO ({partition_definitions(spec, new_bounds)})"))
+        logger.info(f"{spec.table}: created {len(new_bounds)} partitions up to {new_bounds[-1]}")
+    return len(new_bounds)
+
+
+def drop_expired_partitions(db, spec: PartitionSpec, expire_before: datetime) -> int:
+    """
+    DROP các partition chỉ chứa dòng cũ hơn expire_before.
+    Trả về số dòng ước tính (TABLE_ROWS) đã bị xóa.
+    """
+    expire_before = utc_naive(expire_before)
+    expired = [p for p in list_partitions(db, spec.table) if p.bound is not None and p.bound <= expire_before]
+    if not expired:
+        return 0
+    db.execute(text(f"ALTER TABLE {spec.table} DROP PARTITION {', '.join(p.name for p in expired)}"))
+    rows = sum(p.rows for p in expired)
+    logger.info(f"{spec.table}: dropped {len(expired)} partitions (~{rows} rows)")
+    return rows
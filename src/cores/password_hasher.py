@@ -0,0 +1,153 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException
+
+from src.cores.config import settings
+from src.cores.logger import get_logger
+
+logger = get_logger("password_hasher")
+
+T = TypeVar("T")
+
+
+class HashingExecutor:
+    """
+    Pool riêng, giới hạn kích thước cho bcrypt (bcrypt nhả GIL nên thread pool là đủ).
+
+    Handler sync của /auth/login, /auth/register, đổi mật khẩu chạy trong threadpool của
+    AnyIO và thread đó bị giữ trong suốt lúc xếp hàng lẫn lúc băm. Pool này không trả slot
+    lại cho AnyIO mà giới hạn số slot login được giữ:
+    - tối đa max_workers việc chạy cùng lúc và max_pending việc xếp hàng, quá thì 503 ngay
+      (nên tối đa max_workers + max_pending thread AnyIO bị giữ bởi việc băm);
+    - việc xếp hàng quá queue_timeout giây mà chưa được chạy thì bị hủy và trả 503.
+    plan_pool_size() chọn kích thước sao cho tổng này luôn nhỏ hơn số thread của AnyIO.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, queue_timeout: float):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @staticmethod
+    def _busy() -> HTTPException:
+        return HTTPException(status_code=503, detail="Server is busy, please retry", headers={"Retry-After": "1"})
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def run(self, func: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_pending:
+                self.rejected += 1
+                raise self._busy()
+            self._in_flight += 1
+
+        started = threading.Event()
+
+        def call():
+            started.set()
+            return func(*args)
+
+        try:
+            future = self._executor.submit(call)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        # cancel() chỉ thành công khi việc chưa bắt đầu; đã chạy thì chờ kết quả như bình thường
+        if not started.wait(self.queue_timeout) and future.cancel():
+            with self._lock:
+                self.timed_out += 1
+            logger.warning(f"password hash queued over {self.queue_timeout}s, rejected")
+            raise self._busy()
+
+        result = future.result()
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+
+# Số thread mặc định của AnyIO (anyio.to_thread.current_default_thread_limiter()), dùng khi
+# pool được tạo ngoài event loop trước lúc configure_password_hasher() chạy
+DEFAULT_THREADPOOL_TOKENS = 40
+
+
+def plan_pool_size(threadpool_tokens: int, cpu_count: int) -> tuple[int, int]:
+    """
+    Trả về (max_workers, max_pending). Mặc định workers + pending chiếm
+    PASSWORD_HASH_THREADPOOL_SHARE số thread AnyIO; cấu hình tay mà tổng >= threadpool_tokens
+    thì báo lỗi vì một đợt login có thể chiếm hết thread của các route sync khác.
+    """
+    budget = max(2, int(threadpool_tokens * settings.PASSWORD_HASH_THREADPOOL_SHARE))
+    workers = settings.PASSWORD_HASH_WORKERS or max(1, min(cpu_count, budget // 2))
+    pending = settings.PASSWORD_HASH_MAX_PENDING if settings.PASSWORD_HASH_MAX_PENDING is not None else max(0, budget - workers)
+    if workers + pending >= threadpool_tokens:
+        raise ValueError(f"PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING = {workers + pending} must be below the AnyIO threadpool size ({threadpool_tokens})")
+    return workers, pending
+
+
+_hasher: Optional[HashingExecutor] = None
+_hasher_lock = threading.Lock()
+
+
+def _create_hasher(threadpool_tokens: int) -> HashingExecutor:
+    max_workers, max_pending = plan_pool_size(threadpool_tokens, os.cpu_count() or 1)
+    return HashingExecutor(max_workers=max_workers, max_pending=max_pending, queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS)
+
+
+def configure_password_hasher(threadpool_tokens: int) -> HashingExecutor:
+    """
+    Tạo pool theo số thread thực tế của AnyIO; gọi lúc khởi động app để cấu hình sai báo lỗi ngay.
+    """
+    global _hasher
+    hasher = _create_hasher(threadpool_tokens)
+    with _hasher_lock:
+        previous, _hasher = _hasher, hasher
+    if previous is not None:
+        previous.shutdown()
+    return hasher
+
+
+def get_password_hasher() -> HashingExecutor:
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = _create_hasher(DEFAULT_THREADPOOL_TOKENS)
+    return _hasher
+
+
+def shutdown_password_hasher():
+    """
+    Dừng pool khi tắt app; lần gọi get_password_hasher() sau đó tạo pool mới.
+    """
+    global _hasher
+    with _hasher_lock:
+        if _hasher is not None:
+            _hasher.shutdown()
+            _hasher = None
@@ -0,0 +1,255 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Protocol
+
+from src.cores.config import settings
+
+
+class RateLimitBackend(Protocol):
+    def hit(self, key: str, max_requests: int, period_seconds: int) -> bool:
+        """
+        Ghi nhận một request cho key và trả về True nếu key đã vượt giới hạn.
+        """
+        ...
+
+
+class InMemoryRateLimitBackend:
+    """
+    Sliding window log giữ trong process, không đụng tới DB.
+
+    Mỗi key chỉ giữ tối đa max_requests timestamp (deque có maxlen) nên bộ nhớ
+    cho mỗi token bị chặn trên. Số key được giới hạn bởi max_keys, key ít dùng
+    nhất bị loại ra (LRU).
+    """
+
+    def __init__(self, max_keys: int = 10000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._windows: OrderedDict[str, deque] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, max_requests: int, period_seconds: int) -> bool:
+        now = self._clock()
+        window_start = now - period_seconds
+
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or window.maxlen != max_requests:
+                window = deque(window or (), maxlen=max_requests)
+                self._windows[key] = window
+                if len(self._windows) > self.max_keys:
+                    self._windows.popitem(last=False)
+            else:
+                self._windows.move_to_end(key)
+
+            while window and window[0] < window_start:
+                window.popleft()
+
+            count = len(window)
+            window.append(now)
+
+        return count >= max_requests
+
+    def reset(self, key: Optional[str] = None):
+        with self._lock:
+            if key is None:
+                self._windows.clear()
+            else:
+                self._windows.pop(key, None)
+
+    def __len__(self):
+        return len(self._windows)
+
+
+class SqlRateLimitBackend:
+    """
+    Backend cũ: đếm và ghi từng request vào bảng token_usage_log.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+
+    def hit(self, key: str, max_requests: int, period_seconds: int) -> bool:
+        now = datetime.now(timezone.utc)
+        period_start = now - timedelta(seconds=period_seconds)
+
+        count = self.repo.count_token_usage(key, period_start)
+        self.repo.log_token_usage(key, now)
+
+        return count >= max_requests
+
+
+class AsyncSqlRateLimitBackend:
+    """
+    Như SqlRateLimitBackend nhưng dùng repository async; hit() là coroutine.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+
+    async def hit(self, key: str, max_requests: int, period_seconds: int) -> bool:
+        now = datetime.now(timezone.utc)
+        period_start = now - timedelta(seconds=period_seconds)
+
+        count = await self.repo.count_token_usage(key, period_start)
+        await self.repo.log_token_usage(key, now)
+
+        return count >= max_requests
+
+
+class SharedMemoryRateLimitBackend:
+    """
+    Sliding window log đặt trong một file mmap dùng chung giữa các worker
+    (uvicorn --workers N) trên cùng một host.
+
+    File gồm một header và `slots` slot có kích thước cố định. Mỗi slot giữ
+    hash 8 byte của key, vị trí ghi tiếp theo và một ring buffer `capacity`
+    timestamp. Một key được đặt vào nhóm PROBE slot liên tiếp; cả nhóm được
+    khóa bằng fcntl.lockf trên đúng vùng byte đó nên mỗi lần hit là nguyên tử
+    giữa các process mà không cần round trip tới DB.
+    """
+
+    MAGIC = b"RLv1"
+    PROBE = 4
+    _HEADER = struct.Struct("<4sII4x")
+    _SLOT_HEADER = struct.Struct("<QI4x")
+
+    def __init__(self, path: str, capacity: int, slots: int = 4096, clock=time.time):
+        if slots < self.PROBE:
+            raise ValueError(f"slots must be >= {self.PROBE}")
+        self.path = path
+        self.capacity = capacity
+        self.slots = slots
+        self._clock = clock
+        self._times = struct.Struct(f"<{capacity}d")
+        self._slot_size = self._SLOT_HEADER.size + self._times.size
+        self._size = self._HEADER.size + slots * self._slot_size
+        self._lock = threading.Lock()
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._init_file()
+        self._mm = mmap.mmap(self._fd, self._size)
+
+    def _init_file(self):
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            expected = self._HEADER.pack(self.MAGIC, self.slots, self.capacity)
+            header = os.pread(self._fd, self._HEADER.size, 0)
+            if header != expected or os.fstat(self._fd).st_size != self._size:
+                # File mới hoặc layout khác (đổi RATE_LIMIT_MAX_REQUESTS): khởi tạo lại
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, self._size)
+                os.pwrite(self._fd, expected, 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def _key_hash(self, key: str) -> int:
+        # 0 đánh dấu slot trống
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def _slot_offset(self, index: int) -> int:
+        return self._HEADER.size + index * self._slot_size
+
+    def hit(self, key: str, max_requests: int, period_seconds: int) -> bool:
+        if max_requests > self.capacity:
+            raise ValueError(f"max_requests={max_requests} exceeds shared backend capacity={self.capacity}")
+
+        key_hash = self._key_hash(key)
+        first = key_hash % (self.slots - self.PROBE + 1)
+        start = self._slot_offset(first)
+        length = self.PROBE * self._slot_size
+
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, length, start)
+            try:
+                now = self._clock()
+                window_start = now - period_seconds
+                offset = self._find_slot(first, key_hash, window_start)
+
+                slot_hash, head = self._SLOT_HEADER.unpack_from(self._mm, offset)
+                times_offset = offset + self._SLOT_HEADER.size
+                if slot_hash != key_hash:
+                    head = 0
+                    self._times.pack_into(self._mm, times_offset, *([0.0] * self.capacity))
+
+                count = sum(1 for t in self._times.unpack_from(self._mm, times_offset) if t >= window_start)
+                struct.pack_into("<d", self._mm, times_offset + head * 8, now)
+                self._SLOT_HEADER.pack_into(self._mm, offset, key_hash, (head + 1) % self.capacity)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, length, start)
+
+        return count >= max_requests
+
+    def _find_slot(self, first: int, key_hash: int, window_start: float) -> int:
+        """
+        Trả về offset của slot đang giữ key, hoặc slot trống/đã hết hạn đầu tiên.
+        Nếu cả nhóm đều bận thì lấy slot có request mới nhất cũ nhất.
+        """
+        reusable = None
+        oldest, oldest_seen = None, None
+        for index in range(first, first + self.PROBE):
+            offset = self._slot_offset(index)
+            slot_hash, _ = self._SLOT_HEADER.unpack_from(self._mm, offset)
+            if slot_hash == key_hash:
+                return offset
+            latest = max(self._times.unpack_from(self._mm, offset + self._SLOT_HEADER.size))
+            if reusable is None and (slot_hash == 0 or latest < window_start):
+                reusable = offset
+            if oldest_seen is None or latest < oldest_seen:
+                oldest, oldest_seen = offset, latest
+        return reusable if reusable is not None else oldest
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
+
+
+_memory_backend: Optional[InMemoryRateLimitBackend] = None
+_shared_backend: Optional[SharedMemoryRateLimitBackend] = None
+
+
+def get_memory_backend() -> InMemoryRateLimitBackend:
+    global _memory_backend
+    if _memory_backend is None:
+        _memory_backend = InMemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_TRACKED_TOKENS)
+    return _memory_backend
+
+
+def get_shared_backend() -> SharedMemoryRateLimitBackend:
+    global _shared_backend
+    if _shared_backend is None:
+        path = settings.RATE_LIMIT_SHM_PATH or os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "user_post_rate_limit")
+        _shared_backend = SharedMemoryRateLimitBackend(
+            path,
+            capacity=settings.RATE_LIMIT_MAX_REQUESTS,
+            slots=settings.RATE_LIMIT_MAX_TRACKED_TOKENS,
+        )
+    return _shared_backend
+
+
+def get_rate_limit_backend(repo) -> RateLimitBackend:
+    """
+    Chọn backend theo settings.RATE_LIMIT_BACKEND ("memory" | "shared" | "sql").
+    """
+    if settings.RATE_LIMIT_BACKEND == "sql":
+        return SqlRateLimitBackend(repo)
+    if settings.RATE_LIMIT_BACKEND == "shared":
+        return get_shared_backend()
+    return get_memory_backend()
+
+
+def get_async_rate_limit_backend(repo):
+    """
+    Như get_rate_limit_backend nhưng backend "sql" dùng repository async.
+    """
+    if settings.RATE_LIMIT_BACKEND == "sql":
+        return AsyncSqlRateLimitBackend(repo)
+    return get_rate_limit_backend(repo)
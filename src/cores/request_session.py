@@ -0,0 +1,99 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool
+from starlette.concurrency import run_in_threadpool
+
+from src.cores.database import AsyncSessionLocal, SessionLocal
+
+
+class ConnectionCounter:
+    def __init__(self):
+        self.checkouts = 0
+
+
+_current_counter: ContextVar[Optional[ConnectionCounter]] = ContextVar("db_connection_counter", default=None)
+
+
+@contextmanager
+def track_connections():
+    """
+    Đếm số lần checkout connection từ pool trong context hiện tại (một request).
+    """
+    counter = ConnectionCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+def current_connection_count() -> Optional[int]:
+    counter = _current_counter.get()
+    return counter.checkouts if counter else None
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.checkouts += 1
+
+
+# Gắn vào lớp Pool để áp dụng cho cả engine sync lẫn async engine được tạo lazy
+event.listen(Pool, "checkout", _on_checkout)
+
+
+class RequestSessions:
+    """
+    Session sync và async dùng chung cho một request, chỉ được tạo khi cần.
+    DbSessionMiddleware đóng chúng khi request kết thúc.
+    """
+
+    def __init__(self):
+        self._sync: Optional[Session] = None
+        self._async: Optional[AsyncSession] = None
+
+    @property
+    def sync(self) -> Session:
+        if self._sync is None:
+            self._sync = SessionLocal()
+        return self._sync
+
+    @property
+    def async_(self) -> AsyncSession:
+        if self._async is None:
+            self._async = AsyncSessionLocal()
+        return self._async
+
+    async def close(self):
+        if self._async is not None:
+            await self._async.close()
+        if self._sync is not None:
+            # close() trả connection về pool (có rollback) nên chạy ngoài event loop
+            await run_in_threadpool(self._sync.close)
+
+
+def get_request_sessions(scope_or_state) -> Optional[RequestSessions]:
+    state = scope_or_state.get("state") if isinstance(scope_or_state, dict) else scope_or_state
+    if state is None:
+        return None
+    if isinstance(state, dict):
+        return state.get("db")
+    return getattr(state, "db", None)
+
+
+@asynccontextmanager
+async def request_async_session(scope):
+    """
+    AsyncSession của request nếu có DbSessionMiddleware, ngược lại mở session riêng.
+    """
+    sessions = get_request_sessions(scope)
+    if sessions is not None:
+        yield sessions.async_
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
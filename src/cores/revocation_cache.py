@@ -0,0 +1,179 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from src.cores.config import settings
+
+
+class BloomFilter:
+    """
+    Bloom filter đơn giản trên bytearray, dùng double hashing từ một digest blake2b.
+    might_contain == False nghĩa là chắc chắn không có.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: bytes):
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: bytes):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def might_contain(self, item: bytes) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationCache:
+    """
+    Cache trong process cho bảng blacklisted_tokens, khóa theo token_hash (SHA-256).
+
+    - Bloom filter trả lời "chắc chắn chưa bị thu hồi" mà không cần query.
+    - LRU giữ các token đã được DB xác nhận là bị thu hồi.
+    - last_id cho phép đồng bộ tăng dần các dòng do worker khác ghi vào. Auto-increment được cấp
+      lúc INSERT chứ không phải lúc commit, nên một dòng id nhỏ hơn last_id vẫn có thể xuất hiện sau
+      lần sync trước; mỗi lần sync quét lại sync_overlap_ids id cuối (thêm lại vào Bloom filter là idempotent).
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        max_confirmed: int,
+        sync_seconds: float,
+        sync_overlap_ids: int = 1000,
+        clock=time.monotonic,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_confirmed = max_confirmed
+        self.sync_seconds = sync_seconds
+        self.sync_overlap_ids = sync_overlap_ids
+        self._clock = clock
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._confirmed: OrderedDict[bytes, None] = OrderedDict()
+        self._min_id: Optional[int] = None  # id nhỏ nhất đã nạp vào filter hiện tại
+        self._last_id: Optional[int] = None
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, token_hash: bytes):
+        with self._lock:
+            self._bloom.add(token_hash)
+
+    def might_contain(self, token_hash: bytes) -> bool:
+        return self._bloom.might_contain(token_hash)
+
+    def is_confirmed(self, token_hash: bytes) -> bool:
+        with self._lock:
+            if token_hash in self._confirmed:
+                self._confirmed.move_to_end(token_hash)
+                return True
+        return False
+
+    def confirm(self, token_hash: bytes):
+        with self._lock:
+            self._confirmed[token_hash] = None
+            self._confirmed.move_to_end(token_hash)
+            if len(self._confirmed) > self.max_confirmed:
+                self._confirmed.popitem(last=False)
+
+    def sync(self, repo, force: bool = False):
+        """
+        Nạp các dòng có id > last_id - sync_overlap_ids từ bảng. Lần đầu sẽ nạp toàn bộ bảng.
+        Được gọi tối đa một lần mỗi sync_seconds trừ khi force=True.
+
+        Lần sync định kỳ (không force) còn so MIN(id) của bảng: cleanup chỉ chạy trên worker
+        leader, nên khi thấy dòng cũ đã bị xóa mỗi worker tự dựng lại filter của mình thay vì
+        để filter chỉ lớn dần và false positive tăng theo.
+        """
+        if not self._due_for_sync(force):
+            return
+        now = self._clock()
+        if not force and self._rows_deleted(repo.get_min_id()):
+            self.rebuild(repo)
+            return
+        self._load(repo.get_hashes_after(self._sync_from()))
+        self._last_sync = now
+
+    async def sync_async(self, repo, force: bool = False):
+        """
+        Như sync() nhưng với repository async.
+        """
+        if not self._due_for_sync(force):
+            return
+        now = self._clock()
+        if not force and self._rows_deleted(await repo.get_min_id()):
+            self._replace(await repo.get_hashes_after(0))
+            return
+        self._load(await repo.get_hashes_after(self._sync_from()))
+        self._last_sync = now
+
+    def _sync_from(self) -> int:
+        return max(0, (self._last_id or 0) - self.sync_overlap_ids)
+
+    def _due_for_sync(self, force: bool) -> bool:
+        return force or self._last_id is None or self._clock() - self._last_sync >= self.sync_seconds
+
+    def _rows_deleted(self, min_id: Optional[int]) -> bool:
+        """
+        True khi dòng nhỏ nhất đã nạp vào filter không còn trong bảng (cleanup đã xóa bớt).
+        """
+        with self._lock:
+            if self._min_id is None:
+                return False
+            return min_id is None or min_id > self._min_id
+
+    def rebuild(self, repo):
+        """
+        Dựng lại filter từ đầu (sau khi cleanup xóa bớt dòng hết hạn).
+        """
+        self._replace(repo.get_hashes_after(0))
+
+    def _replace(self, rows: Iterable[tuple[int, bytes]]):
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        min_id, last_id = None, 0
+        for row_id, token_hash in rows:
+            bloom.add(token_hash)
+            min_id = row_id if min_id is None else min(min_id, row_id)
+            last_id = max(last_id, row_id)
+        with self._lock:
+            self._bloom = bloom
+            self._confirmed.clear()
+            self._min_id = min_id
+            self._last_id = last_id
+            self._last_sync = self._clock()
+
+    def _load(self, rows: Iterable[tuple[int, bytes]]):
+        with self._lock:
+            last_id = self._last_id or 0
+            for row_id, token_hash in rows:
+                self._bloom.add(token_hash)
+                self._min_id = row_id if self._min_id is None else min(self._min_id, row_id)
+                last_id = max(last_id, row_id)
+            self._last_id = last_id
+
+
+_revocation_cache: Optional[RevocationCache] = None
+
+
+def get_revocation_cache() -> RevocationCache:
+    global _revocation_cache
+    if _revocation_cache is None:
+        _revocation_cache = RevocationCache(
+            capacity=settings.BLACKLIST_BLOOM_CAPACITY,
+            error_rate=settings.BLACKLIST_BLOOM_ERROR_RATE,
+            max_confirmed=settings.BLACKLIST_CACHE_MAX_CONFIRMED,
+            sync_seconds=settings.BLACKLIST_CACHE_SYNC_SECONDS,
+            sync_overlap_ids=settings.BLACKLIST_CACHE_SYNC_OVERLAP_IDS,
+        )
+    return _revocation_cache
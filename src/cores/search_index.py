@@ -0,0 +1,100 @@
+"""
+Inverted index thuần Python, dùng thay FULLTEXT khi DB không phải MySQL (SQLite khi chạy test).
+
+Tách từ và cú pháp truy vấn bám theo InnoDB FULLTEXT ở mức đủ dùng:
+- từ ngắn hơn MIN_TOKEN_SIZE bị bỏ qua (innodb_ft_min_token_size mặc định là 3);
+- natural language: điểm là tổng tf * idf^2 của các từ trong truy vấn;
+- boolean: `+từ` bắt buộc có, `-từ` loại trừ, `từ*` khớp tiền tố.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Hashable, Iterable
+
+MIN_TOKEN_SIZE = 3
+MODE_NATURAL = "natural"
+MODE_BOOLEAN = "boolean"
+ORDER_RELEVANCE = "relevance"  # (điểm, id) giảm dần
+ORDER_RECENT = "recent"  # (created_at, id) giảm dần
+# Điểm được làm tròn trước khi sắp xếp và đưa vào cursor: float đi qua DB -> JSON -> SQL
+# vẫn so sánh bằng được chính xác
+SCORE_PRECISION = 6
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_BOOLEAN_TERM_RE = re.compile(r"([+-]?)(\w+)(\*?)", re.UNICODE)
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in _TOKEN_RE.findall((text or "").lower()) if len(token) >= MIN_TOKEN_SIZE]
+
+
+@dataclass(frozen=True)
+class QueryTerm:
+    word: str
+    required: bool = False
+    excluded: bool = False
+    prefix: bool = False
+
+
+def parse_query(query: str, mode: str = MODE_NATURAL) -> list[QueryTerm]:
+    if mode == MODE_NATURAL:
+        return [QueryTerm(word) for word in tokenize(query)]
+    terms = []
+    for operator, word, star in _BOOLEAN_TERM_RE.findall(query.lower()):
+        if len(word) < MIN_TOKEN_SIZE and not star:
+            continue
+        terms.append(QueryTerm(word, required=operator == "+", excluded=operator == "-", prefix=bool(star)))
+    return terms
+
+
+class InvertedIndex:
+    def __init__(self):
+        self._postings: dict[str, dict[Hashable, int]] = defaultdict(dict)
+        self._doc_count = 0
+
+    @classmethod
+    def build(cls, documents: Iterable[tuple[Hashable, str]]) -> "InvertedIndex":
+        index = cls()
+        for doc_id, text in documents:
+            index.add(doc_id, text)
+        return index
+
+    def add(self, doc_id: Hashable, text: str):
+        self._doc_count += 1
+        for word, frequency in Counter(tokenize(text)).items():
+            self._postings[word][doc_id] = frequency
+
+    def _matches(self, term: QueryTerm) -> dict[Hashable, int]:
+        if not term.prefix:
+            return self._postings.get(term.word, {})
+        matched: dict[Hashable, int] = {}
+        for word, postings in self._postings.items():
+            if word.startswith(term.word):
+                for doc_id, frequency in postings.items():
+                    matched[doc_id] = matched.get(doc_id, 0) + frequency
+        return matched
+
+    def search(self, query: str, mode: str = MODE_NATURAL) -> dict[Hashable, float]:
+        """
+        Trả về {doc_id: điểm} của các tài liệu khớp (điểm > 0, hoặc khớp boolean).
+        """
+        terms = parse_query(query, mode)
+        scores: dict[Hashable, float] = defaultdict(float)
+        required: list[set] = []
+        excluded: set = set()
+        for term in terms:
+            matched = self._matches(term)
+            if term.excluded:
+                excluded.update(matched)
+                continue
+            if term.required:
+                required.append(set(matched))
+            idf = math.log((self._doc_count + 1) / (len(matched) + 1)) + 1
+            for doc_id, frequency in matched.items():
+                scores[doc_id] += frequency * idf * idf
+
+        for doc_ids in required:
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in doc_ids}
+        return {doc_id: score for doc_id, score in scores.items() if doc_id not in excluded}
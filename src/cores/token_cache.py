@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from src.cores.config import settings
+
+
+class VerifiedTokenCache:
+    """
+    LRU cache sha256(token) -> claims của JWT đã verify (chữ ký + claims), mỗi phần tử chỉ
+    dùng được đến exp của token nên token hết hạn luôn đi lại qua jwt.decode và bị từ chối.
+    Không thay thế kiểm tra thu hồi: blacklist vẫn được kiểm tra riêng ở mỗi request.
+    """
+
+    def __init__(self, max_size: int = 10000, clock=time.time):
+        self.max_size = max_size
+        self._clock = clock  # exp là Unix timestamp nên dùng đồng hồ thực
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: bytes) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            # Trả bản sao để caller sửa payload không làm hỏng cache
+            return dict(entry[1])
+
+    def set(self, digest: bytes, payload: dict):
+        expires_at = payload.get("exp")
+        if self.max_size <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        with self._lock:
+            self._entries[digest] = (float(expires_at), dict(payload))
+            self._entries.move_to_end(digest)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+verified_token_cache = VerifiedTokenCache(max_size=settings.VERIFIED_TOKEN_CACHE_MAX_SIZE)
@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from src.cores.config import settings
+from src.models.enums import RoleEnum
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """
+    Thông tin tối thiểu để phân quyền một request, không gắn với DB session.
+    """
+
+    id: str
+    username: str
+    role: RoleEnum
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> "CachedUser":
+        return cls(id=user.id, username=user.username, role=user.role, is_active=user.is_active)
+
+
+class UserStatusCache:
+    """
+    TTL cache username -> CachedUser, giới hạn số phần tử theo LRU.
+    UserService gọi invalidate khi block/unblock/xóa user.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 10000, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, CachedUser]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[CachedUser]:
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= self._clock():
+                del self._entries[username]
+                return None
+            self._entries.move_to_end(username)
+            return user
+
+    def set(self, user: CachedUser):
+        with self._lock:
+            self._entries[user.username] = (self._clock() + self.ttl_seconds, user)
+            self._entries.move_to_end(user.username)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: str):
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_status_cache = UserStatusCache(ttl_seconds=settings.USER_STATUS_CACHE_TTL_SECONDS, max_size=settings.USER_STATUS_CACHE_MAX_SIZE)
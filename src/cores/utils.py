@@ -1,28 +1,87 @@
-from typing import Optional
+from typing import Optional, Union
 
 from fastapi import HTTPException, status
 from jose import ExpiredSignatureError, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.cores import auth
+from src.cores.config import settings
+from src.cores.user_cache import CachedUser, user_status_cache
 from src.models.users import User
 
 
-def validate_token_and_get_user(token: str, db: Session) -> Optional[User]:
-    try:
-        payload = auth.decode_token(token)
-        username = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+def get_cached_user(username: str, db: Session) -> Optional[CachedUser]:
+    """
+    Trả về trạng thái user từ cache; chỉ query DB khi cache miss hoặc hết hạn.
+    """
+    cached = user_status_cache.get(username)
+    if cached is not None:
+        return cached
+
+    user = db.query(User).filter(User.username == username).first()
+    if user is None:
+        return None
+    cached = CachedUser.from_user(user)
+    user_status_cache.set(cached)
+    return cached
+
+
+async def get_cached_user_async(username: str, db: AsyncSession) -> Optional[CachedUser]:
+    cached = user_status_cache.get(username)
+    if cached is not None:
+        return cached
+
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
+    if user is None:
+        return None
+    cached = CachedUser.from_user(user)
+    user_status_cache.set(cached)
+    return cached
+
+
+def _get_username_or_raise(payload: dict) -> str:
+    username = payload.get("sub")
+    if username is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+    return username
 
+
+def _ensure_active(user: Optional[Union[User, CachedUser]]) -> Union[User, CachedUser]:
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User blocked or not found",
+        )
+    return user
+
+
+def get_user_from_payload(payload: dict, db: Session) -> Union[User, CachedUser]:
+    """
+    Lấy user từ payload đã giải mã và kiểm tra trạng thái hoạt động.
+    """
+    username = _get_username_or_raise(payload)
+    if settings.AUTH_STATELESS:
+        user = get_cached_user(username, db)
+    else:
         user = db.query(User).filter(User.username == username).first()
-        if not user or not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User blocked or not found",
-            )
+    return _ensure_active(user)
+
 
-        return user
+async def get_user_from_payload_async(payload: dict, db: AsyncSession) -> Union[User, CachedUser]:
+    username = _get_username_or_raise(payload)
+    if settings.AUTH_STATELESS:
+        user = await get_cached_user_async(username, db)
+    else:
+        user = (await db.execute(select(User).where(User.username == username))).scalars().first()
+    return _ensure_active(user)
+
+
+def validate_token_and_get_user(token: str, db: Session) -> Optional[Union[User, CachedUser]]:
+    try:
+        payload = auth.decode_token(token)
+        return get_user_from_payload(payload, db)
 
     except ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Access token expired")
@@ -1,6 +1,6 @@
-import asyncio
 from contextlib import asynccontextmanager
 
+import anyio.to_thread
 from fastapi import FastAPI, Request
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import HTTPException, RequestValidationError
@@ -12,38 +12,83 @@ from src.cores.config import settings
 from src.cores.database import Base, engine
 from src.cores.dependencies import get_db
 from src.cores.exceptions import APIException
+from src.cores.maintenance import MaintenanceTask, get_maintenance_scheduler
+from src.cores.partitions import PARTITIONED_TABLES, ensure_future_partitions
+from src.cores.password_hasher import configure_password_hasher, shutdown_password_hasher
 from src.middlewares.access_log import AccessLogMiddleware
 from src.middlewares.auth_middleware import AuthMiddleware
+from src.middlewares.db_session import DbSessionMiddleware
 from src.middlewares.rate_limiter import RateLimiterMiddleware
 from src.services.active_access_token_service import ActiveAccessTokenService
 from src.services.blacklist_token_service import BlacklistTokenService
 from src.services.rate_limiter_service import RateLimiterService
+from src.services.session_service import SessionService
+from src.services.token_log_service import TokenLogService, get_token_log_writer
+
+
+def warm_revocation_cache():
+    db_gen = get_db()
+    db = next(db_gen)
+    try:
+        BlacklistTokenService(db).warm_cache()
+    finally:
+        db_gen.close()
+
+
+def precreate_partitions(db) -> int:
+    for spec in PARTITIONED_TABLES:
+        ensure_future_partitions(db, spec)
+    return 0  # không xóa dòng nào
+
+
+def build_maintenance_tasks() -> list[MaintenanceTask]:
+    interval, jitter = settings.CLEANUP_INTERVAL_SECONDS, settings.MAINTENANCE_JITTER_SECONDS
+    return [
+        MaintenanceTask(
+            "blacklisted_tokens",
+            lambda db: BlacklistTokenService(db).cleanup_expired_tokens(expire_minutes=settings.BLACKLIST_TOKEN_EXPIRE_MINUTES),
+            interval,
+            jitter,
+        ),
+        MaintenanceTask("active_access_tokens", lambda db: ActiveAccessTokenService(db).cleanup_expired_tokens(), interval, jitter),
+        MaintenanceTask(
+            "token_usage_log",
+            lambda db: RateLimiterService(db).cleanup_expired_tokens(expire_minutes=settings.TOKEN_USAGE_LOG_EXPIRE_MINUTES),
+            interval,
+            jitter,
+        ),
+        MaintenanceTask("sessions", lambda db: SessionService(db).cleanup_expired_sessions(), settings.SESSION_CLEANUP_INTERVAL_SECONDS, jitter),
+        MaintenanceTask(
+            "token_logs",
+            lambda db: TokenLogService(db).cleanup_expired_logs(retention_days=settings.TOKEN_LOG_RETENTION_DAYS),
+            settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+            jitter,
+        ),
+        MaintenanceTask("partitions", precreate_partitions, settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS, jitter),
+    ]
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async def cleanup_job():
-        while True:
-            db_gen = get_db()
-            db = next(db_gen)
-            try:
-                blacklist_service = BlacklistTokenService(db)
-                token_service = ActiveAccessTokenService(db)
-                token_usage_log = RateLimiterService(db)
-                blacklist_service.cleanup_expired_tokens(expire_minutes=settings.BLACKLIST_TOKEN_EXPIRE_MINUTES)
-                token_service.cleanup_expired_tokens()
-                token_usage_log.cleanup_expired_tokens(expire_minutes=settings.TOKEN_USAGE_LOG_EXPIRE_MINUTES)
-            finally:
-                try:
-                    next(db_gen)
-                except StopIteration:
-                    pass  # Generator đã hoàn tất
-
-            await asyncio.sleep(200)
-
-    asyncio.create_task(cleanup_job())
+    warm_revocation_cache()
+    # Pool băm mật khẩu được chia theo số thread AnyIO thực tế của process
+    configure_password_hasher(anyio.to_thread.current_default_thread_limiter().total_tokens)
+
+    # Cleanup chạy trong threadpool và chỉ trên một worker (leader)
+    scheduler = get_maintenance_scheduler()
+    for task in build_maintenance_tasks():
+        scheduler.register(task)
+    scheduler.start()
+
+    token_log_writer = get_token_log_writer()
+    token_log_writer.start()
+
     yield  # Đây là phần bắt buộc để FastAPI chạy đúng lifecycle
 
+    await scheduler.stop()
+    await token_log_writer.stop()  # ghi nốt audit log còn trong hàng đợi
+    shutdown_password_hasher()
+
 
 # Khởi tạo app
 app = FastAPI(title="FastAPI Security 5", lifespan=lifespan)
@@ -56,6 +101,8 @@ app.add_middleware(
     max_requests=settings.RATE_LIMIT_MAX_REQUESTS,
     period_seconds=settings.RATE_LIMIT_PERIOD_SECONDS,
 )
+# Thêm sau cùng để là middleware ngoài cùng: session của request phải có trước rate limiter/auth
+app.add_middleware(DbSessionMiddleware)
 
 # Đăng ký router
 app.include_router(api_router, prefix="/api/v1")
@@ -1,21 +1,39 @@
 import time
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from src.cores.logger import get_logger
+from src.cores.request_session import current_connection_count
 
 logger = get_logger("access")
 
 
-class AccessLogMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start = time.time()
-        response = await call_next(request)
-        duration_ms = (time.time() - start) * 1000
+class AccessLogMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        client_host = request.client.host if request.client else "unknown"
-        log_msg = f"{request.method} {request.url.path} " f"status={response.status_code} " f"duration={duration_ms:.2f}ms " f"client={client_host}"
-        logger.info(log_msg)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        return response
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            client = scope.get("client")
+            client_host = client[0] if client else "unknown"
+            log_msg = f"{scope['method']} {scope['path']} " f"status={status_code} " f"duration={duration_ms:.2f}ms " f"client={client_host}"
+            connections = current_connection_count()
+            if connections is not None:
+                log_msg += f" db_connections={connections}"
+            logger.info(log_msg)
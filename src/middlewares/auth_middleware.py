@@ -1,49 +1,65 @@
 from datetime import datetime, timezone
 from http import HTTPStatus
+from typing import Iterable, Optional
 
-from fastapi import HTTPException, Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException
+from starlette.requests import Request
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from src.cores.dependencies import get_db
-from src.cores.utils import validate_token_and_get_user
-from src.services.blacklist_token_service import BlacklistTokenService
+from src.cores import auth
+from src.cores.auth_context import get_auth_context
+from src.cores.request_session import request_async_session
+from src.cores.utils import get_user_from_payload_async
+from src.services.blacklist_token_service import AsyncBlacklistTokenService
 
 EXCLUDE_PATHS = ["/api/v1/auth/login", "/api/v1/auth/register", "/api/v1/auth/refresh"]
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if request.url.path in EXCLUDE_PATHS or request.method == "OPTIONS":
-            return await call_next(request)
+class AuthMiddleware:
+    def __init__(self, app: ASGIApp, exclude_paths: Optional[Iterable[str]] = None):
+        self.app = app
+        self.exclude_paths = frozenset(EXCLUDE_PATHS if exclude_paths is None else exclude_paths)
 
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return self._unauthorized_response("Missing or invalid Authorization header", request.url.path)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        response = await self._authenticate(request)
+        if response is not None:
+            await response(scope, receive, send)
+            return
 
-        token = auth_header.split(" ")[1]
-        db_generator = get_db()
-        db = next(db_generator)
+        await self.app(scope, receive, send)
+
+    async def _authenticate(self, request: Request) -> Optional[JSONResponse]:
+        """
+        Xác thực request; trả về response lỗi hoặc None nếu hợp lệ.
+        """
+        context = get_auth_context(request)
+        token = context.token
+        if not token:
+            return self._unauthorized_response("Missing or invalid Authorization header", request.url.path)
 
         try:
-            blacklist_service = BlacklistTokenService(db)
-            if blacklist_service.is_token_blacklisted(token):
-                return self._unauthorized_response("Token has been revoked", request.url.path)
+            async with request_async_session(request.scope) as db:
+                blacklist_service = AsyncBlacklistTokenService(db)
+                if await blacklist_service.is_token_blacklisted(token):
+                    return self._unauthorized_response("Token has been revoked", request.url.path)
 
-            user = validate_token_and_get_user(token, db)
-            request.state.user = user  # gán full user object nếu cần
+                # Giải mã một lần, get_current_user sẽ dùng lại context này
+                context.payload = auth.decode_token(token)
+                context.user = await get_user_from_payload_async(context.payload, db)
+                request.state.user = context.user
 
         except HTTPException as e:
             return self._error_response(e.status_code, e.detail, request.url.path)
         except Exception as e:
             return self._error_response(500, f"Internal Server Error: {e}", request.url.path)
-        finally:
-            try:
-                db_generator.close()  # đảm bảo không rò rỉ session
-            except Exception:
-                pass
 
-        return await call_next(request)
+        return None
 
     def _error_response(self, status_code: int, message: str, path: str):
         return JSONResponse(
@@ -0,0 +1,27 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.cores.request_session import RequestSessions, track_connections
+
+
+class DbSessionMiddleware:
+    """
+    Tạo một RequestSessions cho mỗi request (scope["state"]["db"]) để middleware và
+    dependency get_db/get_async_db dùng chung, đồng thời đếm số connection lấy từ pool.
+    Phải là middleware ngoài cùng để bao cả RateLimiterMiddleware và AuthMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sessions = RequestSessions()
+        scope.setdefault("state", {})["db"] = sessions
+        with track_connections():
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                await sessions.close()
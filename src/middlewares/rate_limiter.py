@@ -1,43 +1,63 @@
 from fastapi import status
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from src.cores.dependencies import get_db
-from src.services.rate_limiter_service import RateLimiterService
+from src.cores.auth_context import get_auth_context
+from src.cores.request_session import request_async_session
+from src.services.rate_limiter_service import AsyncRateLimiterService
 
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, max_requests: int, period_seconds: int):
-        super().__init__(app)
+class RateLimiterMiddleware:
+    def __init__(self, app: ASGIApp, max_requests: int, period_seconds: int):
+        self.app = app
         self.max_requests = max_requests
         self.period_seconds = period_seconds
 
-    async def dispatch(self, request: Request, call_next):
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        token = auth_header.split(" ")[1]
-        db = next(get_db())
+        token = get_auth_context(Request(scope)).token
+        if not token:
+            await self.app(scope, receive, send)
+            return
 
-        try:
-            limiter = RateLimiterService(db)
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
-            if limiter.is_rate_limited(token, self.max_requests, self.period_seconds):
-                limiter.blacklist_token(token)
-                return JSONResponse(
+        try:
+            if await self._check_and_blacklist(scope, token):
+                response = JSONResponse(
                     content={"message": "Too many requests, token has been blacklisted."},
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 )
+                await response(scope, receive, send)
+                return
 
-            return await call_next(request)
+            await self.app(scope, receive, send_wrapper)
 
         except Exception as e:
+            if response_started:
+                raise
             # Log và trả lỗi rõ ràng thay vì để 500 propagate
-            return JSONResponse(
+            response = JSONResponse(
                 content={"detail": f"Internal middleware error: {str(e)}"},
                 status_code=500,
             )
-        finally:
-            db.close()
+            await response(scope, receive, send)
+
+    async def _check_and_blacklist(self, scope: Scope, token: str) -> bool:
+        # AsyncSession chỉ mở kết nối khi thực sự query (backend sql hoặc khi blacklist)
+        async with request_async_session(scope) as db:
+            limiter = AsyncRateLimiterService(db)
+            if await limiter.is_rate_limited(token, self.max_requests, self.period_seconds):
+                await limiter.blacklist_token(token)
+                return True
+            return False
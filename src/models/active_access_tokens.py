@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import BINARY, Column, DateTime, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
 from src.cores.config import settings
@@ -11,7 +11,7 @@ class ActiveAccessToken(Base):
     __tablename__ = "active_access_tokens"
     id = Column(Integer, primary_key=True)
     user_id = Column(String(36), ForeignKey("users.id"), index=True)
-    access_token = Column(String(255), unique=True)
+    token_hash = Column(BINARY(32), unique=True, nullable=False)  # token_digest(access_token), không lưu JWT
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
     expires_at = Column(
         DateTime,
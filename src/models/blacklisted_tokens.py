@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import BINARY, Column, DateTime, Integer
 
 from src.cores.database import Base
 
@@ -8,5 +8,5 @@ from src.cores.database import Base
 class BlacklistedToken(Base):
     __tablename__ = "blacklisted_tokens"
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String(500), unique=False, nullable=False)
+    token_hash = Column(BINARY(32), unique=True, nullable=False)  # token_digest(token), không lưu JWT
     blacklisted_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, String, Text
+from sqlalchemy import Column, ForeignKey, Index, String, Text
 from sqlalchemy.orm import relationship
 
 from src.cores.database import Base
@@ -15,3 +15,9 @@ class Post(BaseMixin, Base):
     user = relationship("User", back_populates="posts")
 
     categories = relationship("Category", secondary=post_category, back_populates="posts")
+
+    __table_args__ = (
+        Index("idx_posts_created_at_id", "created_at", "id"),
+        # Chỉ MySQL tạo FULLTEXT; dialect khác bỏ qua index này (xem cores.search_index)
+        Index("ft_posts_title_content", "title", "content", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
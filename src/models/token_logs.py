@@ -1,16 +1,23 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, DateTime, Index, Integer, String
 
 from src.cores.database import Base
 
 
 class TokenLog(Base):
     __tablename__ = "token_logs"
+    # Khi bảng được partition (cores.partitions), PK trong DB là (id, timestamp)
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String(36), index=True, nullable=True)  # có thể null nếu chưa xác thực user
+    user_id = Column(String(36), nullable=True)  # có thể null nếu chưa xác thực user
     username = Column(String(255), nullable=True)
     ip_address = Column(String(255), nullable=False)
     user_agent = Column(String(255), nullable=True)
     action = Column(String(255), nullable=False)  # ví dụ: "login", "refresh"
-    timestamp = Column(DateTime, default=datetime.now(timezone.utc))
+    timestamp = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    # Lấy log mới nhất của user/action theo thứ tự index, không sort cả lịch sử
+    __table_args__ = (
+        Index("idx_token_logs_user_action_time", "user_id", "action", "timestamp"),
+        Index("idx_token_logs_timestamp_id", "timestamp", "id"),
+    )
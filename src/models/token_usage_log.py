@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, Index, Integer, String
+from sqlalchemy import BINARY, Column, DateTime, Index, Integer
 
 from src.cores.database import Base
 
@@ -8,8 +8,9 @@ from src.cores.database import Base
 class TokenUsageLog(Base):
     __tablename__ = "token_usage_log"
 
+    # Khi bảng được partition (cores.partitions), PK trong DB là (id, requested_at)
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String(500), nullable=False, index=True)
-    requested_at = Column(DateTime, default=datetime.now(timezone.utc))
+    token_hash = Column(BINARY(32), nullable=False)
+    requested_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
 
-    __table_args__ = (Index("idx_token_time", "token", "requested_at"),)
+    __table_args__ = (Index("idx_token_hash_time", "token_hash", "requested_at"),)
@@ -1,6 +1,6 @@
 from sqlalchemy import Boolean, Column
 from sqlalchemy import Enum as SqlEnum
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import relationship
 
 from src.cores.database import Base
@@ -22,3 +22,5 @@ class User(BaseMixin, Base):
     posts = relationship("Post", back_populates="user")
     active_access_tokens = relationship("ActiveAccessToken", back_populates="user")
     sessions = relationship("Session", back_populates="user")
+
+    __table_args__ = (Index("idx_users_created_at_id", "created_at", "id"),)
@@ -1,8 +1,11 @@
 from datetime import datetime, timezone
+from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from src.cores.auth import token_digest
 from src.models.active_access_tokens import ActiveAccessToken
+from src.repositories.base import delete_in_batches
 from src.schemas.active_access_tokens import ActiveAccessTokenCreate
 
 
@@ -10,9 +13,17 @@ class ActiveAccessTokenRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def add(self, token_data: ActiveAccessTokenCreate) -> ActiveAccessToken:
-        db_token = ActiveAccessToken(**token_data.model_dump())
+    def stage(self, token_data: ActiveAccessTokenCreate) -> ActiveAccessToken:
+        """
+        Thêm token vào session hiện tại, không commit (caller commit cùng các thay đổi khác).
+        Chỉ lưu digest của token, không lưu chuỗi JWT.
+        """
+        db_token = ActiveAccessToken(user_id=token_data.user_id, token_hash=token_digest(token_data.access_token))
         self.db.add(db_token)
+        return db_token
+
+    def add(self, token_data: ActiveAccessTokenCreate) -> ActiveAccessToken:
+        db_token = self.stage(token_data)
         self.db.commit()
         self.db.refresh(db_token)
         return db_token
@@ -22,7 +33,7 @@ class ActiveAccessTokenRepository:
         return access_tokens
 
     def delete_token(self, token: str):
-        deleted_count = self.db.query(ActiveAccessToken).filter_by(access_token=token).delete(synchronize_session=False)
+        deleted_count = self.db.query(ActiveAccessToken).filter_by(token_hash=token_digest(token)).delete(synchronize_session=False)
         self.db.commit()
         return deleted_count > 0
 
@@ -36,9 +47,5 @@ class ActiveAccessTokenRepository:
             print("Failed to delete token by user id", e)
             return False
 
-    def delete_expired_tokens(self):
-        expired_tokens = self.db.query(ActiveAccessToken).filter(ActiveAccessToken.expires_at < datetime.now(timezone.utc)).all()
-        for token in expired_tokens:
-            self.db.delete(token)
-        self.db.commit()
-        return len(expired_tokens)
+    def delete_expired_tokens(self, batch_size: Optional[int] = None) -> int:
+        return delete_in_batches(self.db, ActiveAccessToken, ActiveAccessToken.expires_at < datetime.now(timezone.utc), batch_size=batch_size)
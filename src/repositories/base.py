@@ -0,0 +1,50 @@
+from typing import Optional
+
+from sqlalchemy import and_, delete, or_
+from sqlalchemy.orm import Session
+
+from src.cores.config import settings
+from src.cores.logger import get_logger
+from src.cores.pagination import Cursor
+
+logger = get_logger("cleanup")
+
+
+def delete_in_batches(db: Session, model, *criteria, batch_size: Optional[int] = None) -> int:
+    """
+    Xóa trên server bằng `DELETE ... WHERE ... LIMIT n` lặp lại đến khi hết dòng,
+    commit sau mỗi lượt để transaction nhỏ. Trả về tổng số dòng đã xóa.
+    """
+    batch_size = batch_size or settings.CLEANUP_DELETE_BATCH_SIZE
+    stmt = delete(model).where(*criteria).with_dialect_options(mysql_limit=batch_size).execution_options(synchronize_session=False)
+
+    total = 0
+    passes = 0
+    while True:
+        deleted = db.execute(stmt).rowcount
+        db.commit()
+        passes += 1
+        total += deleted
+        logger.info(f"{model.__tablename__}: pass {passes} deleted {deleted} rows")
+        if deleted < batch_size:
+            return total
+
+
+def keyset_page(query, time_column, id_column, after: Optional[Cursor], limit: int):
+    """
+    Trang mới nhất trước theo (time_column, id_column), bắt đầu ngay sau cursor `after`.
+    Lấy limit + 1 dòng để biết còn trang sau; đi theo index nên trang sâu nhanh như trang đầu.
+    """
+    if after is not None:
+        after_time, after_id = after
+        query = query.filter(or_(time_column < after_time, and_(time_column == after_time, id_column < after_id)))
+    return query.order_by(time_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+
+def schema_columns(model, schema, *extra) -> list:
+    """
+    Các cột của model trùng tên với field của response schema (cộng thêm extra), để chỉ
+    SELECT đúng những gì schema cần. Row trả về vẫn model_validate được (from_attributes).
+    """
+    columns = [getattr(model, name) for name in schema.model_fields]
+    return columns + [column for column in extra if column.key not in schema.model_fields]
@@ -1,8 +1,14 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Optional
 
+from sqlalchemy import delete, exists, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.cores.auth import token_digest
+from src.models.active_access_tokens import ActiveAccessToken
 from src.models.blacklisted_tokens import BlacklistedToken
+from src.repositories.base import delete_in_batches
 from src.schemas.blacklist_token import BlacklistedTokenCreate
 
 
@@ -11,19 +17,78 @@ class BlacklistedTokenRepository:
         self.db = db
 
     def add(self, token_data: BlacklistedTokenCreate) -> BlacklistedToken:
-        db_token = BlacklistedToken(**token_data.model_dump())
+        token_hash = token_digest(token_data.token)
+        # token_hash là unique: thu hồi lại token đã thu hồi thì trả về dòng cũ
+        existing = self.db.query(BlacklistedToken).filter(BlacklistedToken.token_hash == token_hash).first()
+        if existing:
+            return existing
+        db_token = BlacklistedToken(token_hash=token_hash)
         self.db.add(db_token)
         self.db.commit()
         self.db.refresh(db_token)
         return db_token
 
+    def blacklist_user_tokens(self, user_id: str) -> int:
+        """
+        Thu hồi mọi access token còn hiệu lực của user trong một transaction:
+        INSERT ... SELECT token_hash từ active_access_tokens vào blacklist (bỏ qua hash đã có),
+        rồi một DELETE. Số round trip không phụ thuộc số token. Trả về số token mới bị thu hồi.
+
+        DELETE chỉ xóa các dòng có token_hash đã nằm trong blacklist: token do một login song song
+        thêm vào sau khi INSERT ... SELECT đọc snapshot vẫn được giữ lại (vẫn được theo dõi) thay vì
+        bị xóa mà không bị thu hồi.
+        """
+        blacklisted = exists().where(BlacklistedToken.token_hash == ActiveAccessToken.token_hash)
+        revoked_at = literal(datetime.now(timezone.utc), BlacklistedToken.blacklisted_at.type)
+        source = select(ActiveAccessToken.token_hash, revoked_at).where(ActiveAccessToken.user_id == user_id, ~blacklisted)
+        try:
+            inserted = self.db.execute(insert(BlacklistedToken).from_select(["token_hash", "blacklisted_at"], source)).rowcount
+            self.db.execute(delete(ActiveAccessToken).where(ActiveAccessToken.user_id == user_id, blacklisted).execution_options(synchronize_session=False))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return inserted
+
     def is_blacklisted(self, token: str) -> bool:
-        # Lọc đúng: filter nhận ColumnElement[bool]
-        return self.db.query(BlacklistedToken).filter(BlacklistedToken.token == token).first() is not None
+        return self.is_hash_blacklisted(token_digest(token))
 
-    def delete_expired_tokens(self, expire_before: datetime):
-        expired_tokens = self.db.query(BlacklistedToken).filter(BlacklistedToken.blacklisted_at < expire_before).all()
-        for token in expired_tokens:
-            self.db.delete(token)
-        self.db.commit()
-        return len(expired_tokens)
+    def is_hash_blacklisted(self, token_hash: bytes) -> bool:
+        return self.db.query(BlacklistedToken.id).filter(BlacklistedToken.token_hash == token_hash).first() is not None
+
+    def get_min_id(self) -> Optional[int]:
+        return self.db.query(func.min(BlacklistedToken.id)).scalar()
+
+    def get_hashes_after(self, last_id: int) -> list[tuple[int, bytes]]:
+        rows = self.db.query(BlacklistedToken.id, BlacklistedToken.token_hash).filter(BlacklistedToken.id > last_id).order_by(BlacklistedToken.id).all()
+        return [(row.id, row.token_hash) for row in rows]
+
+    def delete_expired_tokens(self, expire_before: datetime, batch_size: Optional[int] = None) -> int:
+        return delete_in_batches(self.db, BlacklistedToken, BlacklistedToken.blacklisted_at < expire_before, batch_size=batch_size)
+
+
+class AsyncBlacklistedTokenRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(self, token_data: BlacklistedTokenCreate) -> BlacklistedToken:
+        token_hash = token_digest(token_data.token)
+        existing = (await self.db.execute(select(BlacklistedToken).where(BlacklistedToken.token_hash == token_hash))).scalars().first()
+        if existing:
+            return existing
+        db_token = BlacklistedToken(token_hash=token_hash)
+        self.db.add(db_token)
+        await self.db.commit()
+        await self.db.refresh(db_token)
+        return db_token
+
+    async def is_hash_blacklisted(self, token_hash: bytes) -> bool:
+        result = await self.db.execute(select(BlacklistedToken.id).where(BlacklistedToken.token_hash == token_hash).limit(1))
+        return result.first() is not None
+
+    async def get_min_id(self) -> Optional[int]:
+        return (await self.db.execute(select(func.min(BlacklistedToken.id)))).scalar()
+
+    async def get_hashes_after(self, last_id: int) -> list[tuple[int, bytes]]:
+        result = await self.db.execute(select(BlacklistedToken.id, BlacklistedToken.token_hash).where(BlacklistedToken.id > last_id).order_by(BlacklistedToken.id))
+        return [(row.id, row.token_hash) for row in result]
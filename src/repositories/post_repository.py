@@ -1,9 +1,17 @@
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
+from src.cores.count_cache import count_cache
+from src.cores.pagination import Cursor
+from src.cores.search_index import MODE_BOOLEAN, ORDER_RELEVANCE, SCORE_PRECISION, InvertedIndex
 from src.models import User
+from src.models.post_category import post_category
 from src.models.posts import Post
+from src.repositories.base import keyset_page
 
 
 class PostRepository:
@@ -13,12 +21,19 @@ class PostRepository:
         """
         self.db = db
 
+    def _query_with_categories(self):
+        """
+        PostRead luôn đọc post.categories: nạp categories cho cả trang bằng một SELECT ... IN
+        thay vì lazy load từng bài (N+1).
+        """
+        return self.db.query(Post).options(selectinload(Post.categories))
+
     def get(self, post_id: str) -> Optional[Post]:
         """
         Lấy bài post theo post_id.
         Trả về Post hoặc None nếu không tìm thấy.
         """
-        return self.db.query(Post).filter(Post.id == post_id).first()
+        return self._query_with_categories().filter(Post.id == post_id).first()
 
     def create(self, post: Post) -> Post:
         """
@@ -26,6 +41,7 @@ class PostRepository:
         """
         self.db.add(post)
         self.db.commit()
+        count_cache.invalidate("posts")
         self.db.refresh(post)
         return post
 
@@ -33,14 +49,84 @@ class PostRepository:
         """
         Lấy danh sách tất cả bài post của user có user_id.
         """
-        return self.db.query(Post).filter(Post.user_id == user_id).all()
+        return self._query_with_categories().filter(Post.user_id == user_id).all()
 
     def get_all(self, skip: int, limit: int, is_active: Optional[bool]):
-        query = self.db.query(Post)
+        query = self._query_with_categories()
         if is_active is not None:
             query = query.join(User).filter(User.is_active == is_active)
         return query.offset(skip).limit(limit).all()
 
+    def get_page_after(self, after: Optional[Cursor], limit: int, is_active: Optional[bool]) -> list[Post]:
+        """
+        Keyset pagination theo (created_at, id), mới nhất trước; trả về tối đa limit + 1 bài.
+        """
+        query = self._query_with_categories()
+        if is_active is not None:
+            query = query.join(User).filter(User.is_active == is_active)
+        return keyset_page(query, Post.created_at, Post.id, after, limit)
+
+    def search(
+        self,
+        q: str,
+        mode: str,
+        after: Optional[Cursor],
+        limit: int,
+        order: str = ORDER_RELEVANCE,
+        category_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> list[tuple[Post, float]]:
+        """
+        Tìm bài của user đang active theo title/content, trả về tối đa limit + 1 cặp (post, điểm).
+        MySQL dùng MATCH ... AGAINST trên FULLTEXT index; DB khác dùng InvertedIndex dựng tại chỗ.
+
+        Điểm relevance được tính lại ở mỗi query và phụ thuộc số bài trong bảng, nên khi có bài
+        mới được thêm giữa hai trang, cursor relevance có thể lặp hoặc bỏ sót bài; cần thứ tự ổn
+        định thì dùng order=recent.
+        """
+        if self.db.get_bind().dialect.name != "mysql":
+            return self._search_in_memory(q, mode, after, limit, order, category_id, user_id)
+        query = self._fulltext_query(q, mode, after, limit, order, category_id, user_id)
+        if order != ORDER_RELEVANCE:
+            return keyset_page(query, Post.created_at, Post.id, after, limit)
+        return query.all()
+
+    def _fulltext_query(self, q, mode, after, limit, order, category_id, user_id):
+        relevance = match(Post.title, Post.content, against=q)
+        if mode == MODE_BOOLEAN:
+            relevance = relevance.in_boolean_mode()
+        # Sắp xếp và so cursor trên cùng biểu thức đã làm tròn để giá trị trong cursor khớp chính xác
+        score = func.round(relevance, SCORE_PRECISION)
+        query = self._filter_search(self.db.query(Post, score).options(selectinload(Post.categories)), category_id, user_id).filter(relevance > 0)
+        if order != ORDER_RELEVANCE:
+            return query
+        if after is not None:
+            after_score, after_id = after
+            query = query.filter(or_(score < after_score, and_(score == after_score, Post.id < after_id)))
+        return query.order_by(score.desc(), Post.id.desc()).limit(limit + 1)
+
+    @staticmethod
+    def _filter_search(query, category_id: Optional[str], user_id: Optional[str]):
+        query = query.join(User, Post.user_id == User.id).filter(User.is_active.is_(True))
+        if category_id is not None:
+            query = query.join(post_category, post_category.c.post_id == Post.id).filter(post_category.c.category_id == category_id)
+        if user_id is not None:
+            query = query.filter(Post.user_id == user_id)
+        return query
+
+    def _search_in_memory(self, q, mode, after, limit, order, category_id, user_id) -> list[tuple[Post, float]]:
+        rows = self._filter_search(self.db.query(Post.id, Post.title, Post.content, Post.created_at), category_id, user_id).all()
+        scores = InvertedIndex.build((row.id, f"{row.title} {row.content or ''}") for row in rows).search(q, mode)
+        scores = {post_id: round(score, SCORE_PRECISION) for post_id, score in scores.items()}
+        created_at = {row.id: row.created_at for row in rows}
+
+        def key(post_id):
+            return (scores[post_id] if order == ORDER_RELEVANCE else created_at[post_id], post_id)
+
+        post_ids = sorted((post_id for post_id in scores if after is None or key(post_id) < tuple(after)), key=key, reverse=True)[: limit + 1]
+        posts = {post.id: post for post in self._query_with_categories().filter(Post.id.in_(post_ids))}
+        return [(posts[post_id], scores[post_id]) for post_id in post_ids]
+
     def count_posts(self, is_active: Optional[bool] = None) -> int:
         query = self.db.query(Post)
         if is_active is not None:
@@ -61,3 +147,22 @@ class PostRepository:
         """
         self.db.delete(post)
         self.db.commit()
+        count_cache.invalidate("posts")
+
+
+class AsyncPostRepository:
+    """
+    Các truy vấn đọc bài post trên AsyncSession. Categories được nạp sẵn bằng
+    selectinload vì AsyncSession không cho phép lazy load khi serialize.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, post_id: str) -> Optional[Post]:
+        query = select(Post).options(selectinload(Post.categories)).where(Post.id == post_id)
+        return (await self.db.execute(query)).scalars().first()
+
+    async def get_posts_by_user_id(self, user_id: str) -> list[Post]:
+        query = select(Post).options(selectinload(Post.categories)).where(Post.user_id == user_id)
+        return list((await self.db.execute(query)).scalars().all())
@@ -1,10 +1,16 @@
 from datetime import datetime
+from typing import Optional
 
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.cores.auth import token_digest
+from src.cores.partitions import TOKEN_USAGE_LOG_PARTITIONS, drop_expired_partitions, is_partitioned
 from src.models.active_access_tokens import ActiveAccessToken
 from src.models.blacklisted_tokens import BlacklistedToken
 from src.models.token_usage_log import TokenUsageLog
+from src.repositories.base import delete_in_batches
 
 
 class RateLimiterRepository:
@@ -12,27 +18,48 @@ class RateLimiterRepository:
         self.db = db
 
     def count_token_usage(self, token: str, since: datetime) -> int:
-        return self.db.query(TokenUsageLog).filter(TokenUsageLog.token == token).filter(TokenUsageLog.requested_at >= since).count()
+        token_hash = token_digest(token)
+        return self.db.query(TokenUsageLog).filter(TokenUsageLog.token_hash == token_hash).filter(TokenUsageLog.requested_at >= since).count()
 
     def log_token_usage(self, token: str, timestamp: datetime):
-        self.db.add(TokenUsageLog(token=token, requested_at=timestamp))
+        self.db.add(TokenUsageLog(token_hash=token_digest(token), requested_at=timestamp))
         self.db.commit()
 
     def blacklist_token(self, token: str):
-        self.db.query(ActiveAccessToken).filter(ActiveAccessToken.access_token == token).delete()
+        token_hash = token_digest(token)
+        self.db.query(ActiveAccessToken).filter(ActiveAccessToken.token_hash == token_hash).delete()
 
         # Check nếu đã tồn tại rồi thì khỏi insert
-        exists = self.db.query(BlacklistedToken).filter(BlacklistedToken.token == token).first()
+        exists = self.db.query(BlacklistedToken.id).filter(BlacklistedToken.token_hash == token_hash).first()
 
         if not exists:
-            self.db.add(BlacklistedToken(token=token))
-            self.db.commit()
+            self.db.add(BlacklistedToken(token_hash=token_hash))
+        self.db.commit()
 
-    def delete_expired_tokens(self, expire_before: datetime):
-        expired_tokens = self.db.query(TokenUsageLog).filter(TokenUsageLog.requested_at < expire_before).all()
-        print(f"[DEBUG] Tokens to delete: {len(expired_tokens)}")
+    def delete_expired_tokens(self, expire_before: datetime, batch_size: Optional[int] = None) -> int:
+        if is_partitioned(self.db, TOKEN_USAGE_LOG_PARTITIONS.table):
+            return drop_expired_partitions(self.db, TOKEN_USAGE_LOG_PARTITIONS, expire_before)
+        return delete_in_batches(self.db, TokenUsageLog, TokenUsageLog.requested_at < expire_before, batch_size=batch_size)
 
-        for token in expired_tokens:
-            self.db.delete(token)
-        self.db.commit()
-        return len(expired_tokens)
+
+class AsyncRateLimiterRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def count_token_usage(self, token: str, since: datetime) -> int:
+        token_hash = token_digest(token)
+        query = select(func.count()).select_from(TokenUsageLog).where(TokenUsageLog.token_hash == token_hash, TokenUsageLog.requested_at >= since)
+        return (await self.db.execute(query)).scalar_one()
+
+    async def log_token_usage(self, token: str, timestamp: datetime):
+        self.db.add(TokenUsageLog(token_hash=token_digest(token), requested_at=timestamp))
+        await self.db.commit()
+
+    async def blacklist_token(self, token: str):
+        token_hash = token_digest(token)
+        await self.db.execute(delete(ActiveAccessToken).where(ActiveAccessToken.token_hash == token_hash))
+
+        exists = (await self.db.execute(select(BlacklistedToken.id).where(BlacklistedToken.token_hash == token_hash))).first()
+        if not exists:
+            self.db.add(BlacklistedToken(token_hash=token_hash))
+        await self.db.commit()
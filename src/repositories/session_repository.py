@@ -1,8 +1,10 @@
 from datetime import datetime, timezone
+from typing import Optional
 
 from sqlalchemy.orm import Session
 
 from src.models.sessions import Session as SessionModel
+from src.repositories.base import delete_in_batches
 from src.schemas.session import SessionCreate
 
 
@@ -13,9 +15,16 @@ class SessionRepository:
     def get_by_refresh_token(self, refresh_token: str):
         return self.db.query(SessionModel).filter_by(refresh_token=refresh_token).first()
 
-    def add_session(self, session_data: SessionCreate) -> SessionModel:
+    def stage_session(self, session_data: SessionCreate) -> SessionModel:
+        """
+        Thêm session vào DB session hiện tại, không commit (caller commit cùng các thay đổi khác).
+        """
         db_session = SessionModel(**session_data.model_dump())  # ✅ Chuyển Pydantic -> SQLAlchemy
         self.db.add(db_session)
+        return db_session
+
+    def add_session(self, session_data: SessionCreate) -> SessionModel:
+        db_session = self.stage_session(session_data)
         self.db.commit()
         self.db.refresh(db_session)
         return db_session
@@ -25,14 +34,10 @@ class SessionRepository:
         self.db.commit()
 
     def revoke_all_sessions(self, user_id: str):
-        sessions = self.db.query(SessionModel).filter_by(user_id=user_id, revoked=False).all()
-        for s in sessions:
-            s.revoked = True
+        # Một UPDATE thay vì nạp từng session lên rồi sửa
+        self.db.query(SessionModel).filter_by(user_id=user_id, revoked=False).update({SessionModel.revoked: True}, synchronize_session=False)
         self.db.commit()
 
-    def delete_expired_sessions(self):
+    def delete_expired_sessions(self, batch_size: Optional[int] = None) -> int:
         now = datetime.now(timezone.utc)
-        expired_sessions = self.db.query(SessionModel).filter(SessionModel.expires_at < now).all()
-        for s in expired_sessions:
-            self.db.delete(s)
-        self.db.commit()
+        return delete_in_batches(self.db, SessionModel, SessionModel.expires_at < now, batch_size=batch_size)
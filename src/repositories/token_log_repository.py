@@ -1,8 +1,13 @@
+from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from src.cores.pagination import Cursor
+from src.cores.partitions import TOKEN_LOG_PARTITIONS, drop_expired_partitions
 from src.models.token_logs import TokenLog
+from src.repositories.base import keyset_page
 from src.schemas.token_log import TokenLogCreate
 
 
@@ -23,9 +28,18 @@ class TokenLogRepository:
         self.db.refresh(db_log)
         return db_log
 
+    def create_many(self, rows: list[dict]) -> int:
+        # executemany với insert() được SQLAlchemy gộp thành INSERT ... VALUES (...), (...)
+        self.db.execute(insert(TokenLog), rows)
+        self.db.commit()
+        return len(rows)
+
     def get_paginated(self, skip: int, limit: int) -> list[type[TokenLog]]:
         return self.db.query(TokenLog).offset(skip).limit(limit).all()
 
+    def get_page_after(self, after: Optional[Cursor], limit: int) -> list[TokenLog]:
+        return keyset_page(self.db.query(TokenLog), TokenLog.timestamp, TokenLog.id, after, limit)
+
     def get_last_log(self, user_id: str, action: str) -> Optional[TokenLog]:
         """
         Trả về log mới nhất cho user và action chỉ định.
@@ -36,3 +50,10 @@ class TokenLogRepository:
             TokenLog | None: Log mới nhất hoặc None nếu không có.
         """
         return self.db.query(TokenLog).filter(TokenLog.user_id == user_id, TokenLog.action == action).order_by(TokenLog.timestamp.desc()).first()
+
+    def get_recent_logs(self, user_id: str, action: str, limit: int) -> list[TokenLog]:
+        return self.db.query(TokenLog).filter(TokenLog.user_id == user_id, TokenLog.action == action).order_by(TokenLog.timestamp.desc(), TokenLog.id.desc()).limit(limit).all()
+
+    def drop_expired_logs(self, expire_before: datetime) -> int:
+        # Audit log chỉ được dọn khi bảng đã partition; bảng thường giữ nguyên như trước
+        return drop_expired_partitions(self.db, TOKEN_LOG_PARTITIONS, expire_before)
@@ -1,12 +1,17 @@
 from typing import List, Optional
 
+from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from src.cores.count_cache import count_cache
+from src.cores.pagination import Cursor
 from src.models import Session as SessionModels
 from src.models.posts import Post
 from src.models.users import RoleEnum, User
+from src.repositories.base import keyset_page, schema_columns
 
 
 class UserRepository:
@@ -34,6 +39,7 @@ class UserRepository:
     def create_user(self, user: User) -> User:
         self.db.add(user)
         self.db.commit()
+        count_cache.invalidate("users")
         self.db.refresh(user)
         return user
 
@@ -42,6 +48,7 @@ class UserRepository:
 
     def update_user(self, user: User):
         self._commit_and_refresh(user)
+        count_cache.invalidate("users")  # fullname thuộc bộ lọc name
 
     def update_password(self, user: User, new_password_hash: str):
         user.password = new_password_hash
@@ -50,10 +57,12 @@ class UserRepository:
     def block_user(self, user: User):
         user.is_active = False
         self._commit_and_refresh(user)
+        count_cache.invalidate("users", "posts")  # posts được đếm theo trạng thái user
 
     def unblock_user(self, user: User):
         user.is_active = True
         self._commit_and_refresh(user)
+        count_cache.invalidate("users", "posts")
 
     def list_users(self, status: Optional[bool] = None, skip: int = 0, limit: int = 100) -> list[type[User]]:
         query = self.db.query(User)
@@ -68,6 +77,7 @@ class UserRepository:
 
             self.db.delete(user)
             self.db.commit()
+            count_cache.invalidate("users", "posts")
         except SQLAlchemyError as e:
             self.db.rollback()
             raise e
@@ -94,11 +104,29 @@ class UserRepository:
         name: Optional[str] = None,
         is_active: Optional[bool] = None,
         role: Optional[RoleEnum] = None,
+        schema: Optional[type[BaseModel]] = None,
     ) -> List[User]:
-        query = self.db.query(User).options(joinedload(User.posts))
+        """
+        Có schema thì chỉ SELECT các cột schema cần và trả về Row thay vì User.
+        """
+        query = self.db.query(*schema_columns(User, schema)) if schema else self.db.query(User)
         query = self._filter_by_name_and_status(query, name, is_active, role)
         return query.offset(skip).limit(limit).all()
 
+    def get_page_after(
+        self,
+        after: Optional[Cursor],
+        limit: int,
+        name: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        role: Optional[RoleEnum] = None,
+        schema: Optional[type[BaseModel]] = None,
+    ) -> List[User]:
+        # created_at luôn được chọn vì cursor trang sau cần nó
+        query = self.db.query(*schema_columns(User, schema, User.created_at)) if schema else self.db.query(User)
+        query = self._filter_by_name_and_status(query, name, is_active, role)
+        return keyset_page(query, User.created_at, User.id, after, limit)
+
     def count_users(
         self,
         name: Optional[str] = None,
@@ -108,3 +136,11 @@ class UserRepository:
         query = self.db.query(func.count(User.id))
         query = self._filter_by_name_and_status(query, name, is_active, role)
         return query.scalar()
+
+
+class AsyncUserRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, user_id: str) -> Optional[User]:
+        return await self.db.get(User, user_id)
@@ -8,8 +8,9 @@ class ActiveAccessTokenCreate(BaseModel):
     access_token: str
 
 
-class ActiveAccessTokenRead(ActiveAccessTokenCreate):
+class ActiveAccessTokenRead(BaseModel):
     id: int
+    user_id: str
     created_at: datetime
     expires_at: datetime
 
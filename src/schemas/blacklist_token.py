@@ -9,6 +9,6 @@ class BlacklistedTokenCreate(BaseModel):
 
 class BlacklistedTokenRead(BaseModel):
     id: int
-    token: str
+    token_hash: bytes
     blacklisted_at: datetime
     model_config = ConfigDict(from_attributes=True)
@@ -33,3 +33,8 @@ class PostRead(BaseModel):
     user_id: str
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Kết quả tìm kiếm: bài viết kèm điểm relevance
+class PostSearchResult(PostRead):
+    score: float
@@ -4,15 +4,25 @@ from pydantic import BaseModel, HttpUrl
 
 
 class PaginationSchema(BaseModel):
-    total: int
+    total: Optional[int] = None  # None khi include_total=false
     limit: int
     offset: int
 
 
+class CursorPaginationSchema(BaseModel):
+    limit: int
+    next_cursor: Optional[str] = None
+
+
 class LinkSchema(BaseModel):
     self: HttpUrl
     next: Optional[HttpUrl] = None
-    last: HttpUrl
+    last: Optional[HttpUrl] = None
+
+
+class CursorLinkSchema(BaseModel):
+    self: HttpUrl
+    next: Optional[HttpUrl] = None
 
 
 class MessageResponse(BaseModel):
@@ -42,6 +52,14 @@ class PaginatedResponse(BaseModel, Generic[T]):
     link: LinkSchema
 
 
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    status_code: int
+    message: str
+    data: List[T]
+    pagination: CursorPaginationSchema
+    link: CursorLinkSchema
+
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str
@@ -1,10 +1,37 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from src.cores import auth
+from src.cores.config import settings
+from src.cores.logger import get_logger
 from src.models import User
+from src.models.enums import RoleEnum
+from src.repositories.active_access_token_repository import ActiveAccessTokenRepository
+from src.repositories.session_repository import SessionRepository
 from src.repositories.user_repository import UserRepository
+from src.schemas.active_access_tokens import ActiveAccessTokenCreate
+from src.schemas.session import SessionCreate
 from src.schemas.users import UserCreate
+from src.services.token_log_service import TokenLogService
+
+logger = get_logger("auth")
+
+
+@dataclass(frozen=True)
+class LoginResult:
+    """
+    Dữ liệu trả về cho client, chụp lại trước commit nên đọc không cần reload user.
+    """
+
+    user_id: str
+    username: str
+    role: RoleEnum
+    access_token: str
+    refresh_token: str
 
 
 class AuthService:
@@ -27,3 +54,66 @@ class AuthService:
 
         created_user = self.repo.create_user(User(**user_data.model_dump()))
         return created_user
+
+    def verify_password_and_rehash(self, user: User, password: str, commit: bool = True) -> bool:
+        """
+        Kiểm tra mật khẩu khi login; hash cũ có cost khác BCRYPT_ROUNDS được thay bằng hash mới
+        ngay lúc này, khi đang có mật khẩu gốc. commit=False chỉ gán hash mới, caller commit.
+        """
+        verified, new_hash = auth.verify_and_update_password(password, user.password)
+        if verified and new_hash:
+            if commit:
+                self.repo.update_password(user, new_hash)
+            else:
+                user.password = new_hash
+        return verified
+
+    def login(self, username: str, password: str, ip_address: str, user_agent: Optional[str]) -> LoginResult:
+        """
+        Login trong một transaction: access token, session và hash mật khẩu mới (nếu có) được
+        thêm vào session rồi commit một lần, không refresh sau commit. Audit log (và fingerprint)
+        chỉ được đưa vào writer nền sau khi commit thành công.
+        """
+        user = self.repo.get_user_by_username(username)
+        if not user or not self.verify_password_and_rehash(user, password, commit=False):
+            if user:
+                self._log_action(user.id, user.username, "login failed", ip_address, user_agent)
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+
+        if not user.is_active:
+            raise HTTPException(status_code=401, detail="User blocked")
+
+        result = LoginResult(
+            user_id=user.id,
+            username=user.username,
+            role=user.role,
+            access_token=auth.create_access_token(username=str(user.username), role=user.role),
+            refresh_token=auth.create_refresh_token(username=str(user.username), role=user.role),
+        )
+
+        try:
+            ActiveAccessTokenRepository(self.db).stage(ActiveAccessTokenCreate(user_id=result.user_id, access_token=result.access_token))
+            SessionRepository(self.db).stage_session(
+                SessionCreate(
+                    user_id=result.user_id,
+                    refresh_token=result.refresh_token,
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                    expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+                )
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise HTTPException(status_code=401, detail="Session creation failed")
+
+        # Dùng result thay vì user: user đã bị expire sau commit, đọc lại sẽ tốn một query
+        self._log_action(result.user_id, result.username, "login", ip_address, user_agent)
+        return result
+
+    def _log_action(self, user_id: str, username: str, action: str, ip_address: str, user_agent: Optional[str]):
+        # Audit log lỗi không được làm hỏng login
+        try:
+            TokenLogService(self.db).log_action(user_id, username, ip_address, user_agent, action)
+        except Exception:
+            logger.exception(f"failed to log {action} for user {user_id}")
@@ -1,23 +1,81 @@
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.repositories.blacklist_token_repository import BlacklistedTokenRepository
+from src.cores.auth import token_digest
+from src.cores.revocation_cache import RevocationCache, get_revocation_cache
+from src.repositories.blacklist_token_repository import AsyncBlacklistedTokenRepository, BlacklistedTokenRepository
 from src.schemas.blacklist_token import BlacklistedTokenCreate
 
 
 class BlacklistTokenService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache: Optional[RevocationCache] = None):
         self.repo = BlacklistedTokenRepository(db)
+        self.cache = cache or get_revocation_cache()
 
     def blacklist_token(self, token: str):
         token_data = BlacklistedTokenCreate(token=token)
-        return self.repo.add(token_data)
+        db_token = self.repo.add(token_data)
+        self.cache.add(db_token.token_hash)
+        return db_token
+
+    def revoke_user_tokens(self, user_id: str) -> int:
+        """
+        Thu hồi hàng loạt access token của user (logout-all, admin block/xóa user).
+        """
+        revoked = self.repo.blacklist_user_tokens(user_id)
+        if revoked:
+            # Nạp ngay các hash vừa thêm vào bloom filter của worker này; worker khác tự sync sau
+            self.cache.sync(self.repo, force=True)
+        return revoked
 
     def is_token_blacklisted(self, token: str) -> bool:
-        return self.repo.is_blacklisted(token)
+        token_hash = token_digest(token)
+        self.cache.sync(self.repo)
+        # Bloom filter âm tính => chắc chắn chưa bị thu hồi, không cần query
+        if not self.cache.might_contain(token_hash):
+            return False
+        if self.cache.is_confirmed(token_hash):
+            return True
+        if self.repo.is_hash_blacklisted(token_hash):
+            self.cache.confirm(token_hash)
+            return True
+        return False
+
+    def warm_cache(self):
+        self.cache.rebuild(self.repo)
 
     def cleanup_expired_tokens(self, expire_minutes):
         expire_time = datetime.now(timezone.utc) - timedelta(minutes=expire_minutes)
-        # Xóa tất cả token blacklist có blacklisted_at < expire_time
+        # Xóa tất cả token blacklist có blacklisted_at < expire_time.
+        # Không rebuild ở đây: mỗi worker (kể cả leader) tự rebuild khi sync thấy MIN(id) tăng.
         return self.repo.delete_expired_tokens(expire_time)
+
+
+class AsyncBlacklistTokenService:
+    """
+    Bản async dùng trong middleware, chia sẻ cùng RevocationCache với bản sync.
+    """
+
+    def __init__(self, db: AsyncSession, cache: Optional[RevocationCache] = None):
+        self.repo = AsyncBlacklistedTokenRepository(db)
+        self.cache = cache or get_revocation_cache()
+
+    async def blacklist_token(self, token: str):
+        db_token = await self.repo.add(BlacklistedTokenCreate(token=token))
+        self.cache.add(db_token.token_hash)
+        return db_token
+
+    async def is_token_blacklisted(self, token: str) -> bool:
+        token_hash = token_digest(token)
+        await self.cache.sync_async(self.repo)
+        if not self.cache.might_contain(token_hash):
+            return False
+        if self.cache.is_confirmed(token_hash):
+            return True
+        if await self.repo.is_hash_blacklisted(token_hash):
+            self.cache.confirm(token_hash)
+            return True
+        return False
@@ -1,15 +1,21 @@
+from datetime import datetime
 from typing import Optional
+from urllib.parse import urlencode
 
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette.responses import JSONResponse
 
+from src.cores.count_cache import count_cache
+from src.cores.pagination import cursor_page, decode_cursor, offset_page
+from src.cores.search_index import MODE_NATURAL, ORDER_RELEVANCE
 from src.models import Category
 from src.models.posts import Post
 from src.models.users import User
 from src.repositories.category_repository import CategoryRepository
-from src.repositories.post_repository import PostRepository
-from src.repositories.user_repository import UserRepository
+from src.repositories.post_repository import AsyncPostRepository, PostRepository
+from src.repositories.user_repository import AsyncUserRepository, UserRepository
 from src.schemas.posts import PostCreate, PostRead, PostUpdate
 
 
@@ -89,16 +95,16 @@ class PostService:
         page: Optional[int] = 0,
         limit: Optional[int] = 100,
         is_active: Optional[bool] = None,
+        include_total: bool = True,
     ):
         """
         Lấy tất cả bài post. Nếu is_active != None thì lọc theo trạng thái user.
-        Có hỗ trợ phân trang.
+        Có hỗ trợ phân trang; tổng số bài được cache theo bộ lọc, include_total=False bỏ qua COUNT.
         """
         try:
             skip = (page - 1) * limit
-            total = self.post_repo.count_posts(is_active)
-            posts = self.post_repo.get_all(skip, limit, is_active)
-            last_page = (total - 1) // limit + 1
+            count = (lambda: count_cache.get_or_load("posts", (is_active,), lambda: self.post_repo.count_posts(is_active))) if include_total else None
+            posts, total, last_page, has_next = offset_page(lambda skip, limit: self.post_repo.get_all(skip, limit, is_active), page, limit, count)
             return JSONResponse(
                 status_code=200,
                 content={
@@ -108,8 +114,8 @@ class PostService:
                     "pagination": {"total": total, "limit": limit, "offset": skip},
                     "link": {
                         "self": f"http://127.0.0.1:8000/api/v1/posts?page={page}&limit={limit}&is_active={is_active}",
-                        "next": (f"http://127.0.0.1:8000/api/v1/posts?page={page + 1}&limit={limit}&is_active={is_active}" if page < last_page else None),
-                        "last": f"http://127.0.0.1:8000/api/v1/posts?page={last_page}&limit={limit}&is_active={is_active}",
+                        "next": (f"http://127.0.0.1:8000/api/v1/posts?page={page + 1}&limit={limit}&is_active={is_active}" if has_next else None),
+                        "last": (f"http://127.0.0.1:8000/api/v1/posts?page={last_page}&limit={limit}&is_active={is_active}" if last_page else None),
                     },
                 },
             )
@@ -117,6 +123,77 @@ class PostService:
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Get posts failed: {e}")
 
+    def get_all_by_cursor(self, cursor: str, limit: int = 100, is_active: Optional[bool] = None):
+        """
+        Như get_all nhưng phân trang theo cursor (created_at, id): không OFFSET, không COUNT.
+        """
+        after = decode_cursor(cursor)
+        try:
+            rows = self.post_repo.get_page_after(after, limit, is_active)
+            posts, next_cursor = cursor_page(rows, limit, lambda post: (post.created_at, post.id))
+            return JSONResponse(
+                status_code=200,
+                content={
+                    "status_code": 200,
+                    "message": "Get Posts Successfully",
+                    "data": [PostRead.model_validate(post).model_dump() for post in posts],
+                    "pagination": {"limit": limit, "next_cursor": next_cursor},
+                    "link": {
+                        "self": f"http://127.0.0.1:8000/api/v1/posts?cursor={cursor}&limit={limit}&is_active={is_active}",
+                        "next": (f"http://127.0.0.1:8000/api/v1/posts?cursor={next_cursor}&limit={limit}&is_active={is_active}" if next_cursor else None),
+                    },
+                },
+            )
+
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Get posts failed: {e}")
+
+    def search(
+        self,
+        q: str,
+        cursor: str = "",
+        limit: int = 10,
+        mode: str = MODE_NATURAL,
+        order: str = ORDER_RELEVANCE,
+        category_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ):
+        """
+        Tìm bài viết theo title/content, lọc theo category và tác giả.
+        Phân trang theo cursor (điểm, id) khi order=relevance, (created_at, id) khi order=recent.
+        Cursor relevance có thể lệch (lặp/bỏ sót bài) nếu có bài mới được thêm trong lúc phân trang.
+        """
+        after = decode_cursor(cursor)
+        if after is not None and isinstance(after[0], datetime) == (order == ORDER_RELEVANCE):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        try:
+            rows = self.post_repo.search(q, mode, after, limit, order, category_id, user_id)
+            if order == ORDER_RELEVANCE:
+                results, next_cursor = cursor_page(rows, limit, lambda row: (row[1], row[0].id))
+            else:
+                results, next_cursor = cursor_page(rows, limit, lambda row: (row[0].created_at, row[0].id))
+            params = {"q": q, "limit": limit, "mode": mode, "order": order}
+            if category_id is not None:
+                params["category_id"] = category_id
+            if user_id is not None:
+                params["user_id"] = user_id
+            return JSONResponse(
+                status_code=200,
+                content={
+                    "status_code": 200,
+                    "message": "Search Posts Successfully",
+                    "data": [{**PostRead.model_validate(post).model_dump(), "score": score} for post, score in results],
+                    "pagination": {"limit": limit, "next_cursor": next_cursor},
+                    "link": {
+                        "self": f"http://127.0.0.1:8000/api/v1/posts/search?{urlencode({**params, 'cursor': cursor})}",
+                        "next": (f"http://127.0.0.1:8000/api/v1/posts/search?{urlencode({**params, 'cursor': next_cursor})}" if next_cursor else None),
+                    },
+                },
+            )
+
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Search posts failed: {e}")
+
     def _get_post_and_check_owner(self, post_id: str, user_id: str):
         post = self.post_repo.get(post_id)
         if not post:
@@ -148,3 +225,37 @@ class PostService:
             return post
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Delete post failed: {e}")
+
+
+class AsyncPostService:
+    """
+    Các thao tác đọc bài post trên AsyncSession, dùng cho các route async.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.post_repo = AsyncPostRepository(db)
+        self.user_repo = AsyncUserRepository(db)
+
+    async def _get_user_and_check_status(self, user_id: str) -> User:
+        user = await self.user_repo.get(user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        if not user.is_active:
+            raise HTTPException(status_code=403, detail="User is blocked")
+        return user
+
+    async def get_posts_by_user_id(self, user_id: str):
+        await self._get_user_and_check_status(user_id)
+        try:
+            return await self.post_repo.get_posts_by_user_id(user_id)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Get posts by user failed: {e}")
+
+    async def get_post_by_id(self, post_id: str) -> Post:
+        post = await self.post_repo.get(post_id)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+
+        await self._get_user_and_check_status(post.user_id)
+        return post
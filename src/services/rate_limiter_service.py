@@ -1,26 +1,45 @@
+import inspect
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.repositories.rate_limiter_repository import RateLimiterRepository
+from src.cores.auth import token_digest
+from src.cores.rate_limit import RateLimitBackend, get_async_rate_limit_backend, get_rate_limit_backend
+from src.cores.revocation_cache import get_revocation_cache
+from src.repositories.rate_limiter_repository import AsyncRateLimiterRepository, RateLimiterRepository
 
 
 class RateLimiterService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, backend: Optional[RateLimitBackend] = None):
         self.repo = RateLimiterRepository(db)
+        self.backend = backend or get_rate_limit_backend(self.repo)
 
     def is_rate_limited(self, token: str, max_requests, period_seconds) -> bool:
-        now = datetime.now(timezone.utc)
-        period_start = now - timedelta(seconds=period_seconds)
-
-        count = self.repo.count_token_usage(token, period_start)
-        self.repo.log_token_usage(token, now)
-
-        return count >= max_requests
+        return self.backend.hit(token, max_requests, period_seconds)
 
     def blacklist_token(self, token: str):
         self.repo.blacklist_token(token)
+        get_revocation_cache().add(token_digest(token))
 
     def cleanup_expired_tokens(self, expire_minutes: int):
         expire_time = datetime.now(timezone.utc) - timedelta(minutes=expire_minutes)
         return self.repo.delete_expired_tokens(expire_time)
+
+
+class AsyncRateLimiterService:
+    def __init__(self, db: AsyncSession, backend=None):
+        self.repo = AsyncRateLimiterRepository(db)
+        self.backend = backend or get_async_rate_limit_backend(self.repo)
+
+    async def is_rate_limited(self, token: str, max_requests, period_seconds) -> bool:
+        # Backend memory/shared trả về bool ngay, backend sql trả về coroutine
+        result = self.backend.hit(token, max_requests, period_seconds)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def blacklist_token(self, token: str):
+        await self.repo.blacklist_token(token)
+        get_revocation_cache().add(token_digest(token))
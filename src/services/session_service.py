@@ -39,4 +39,4 @@ class SessionService:
         self.repo.revoke_all_sessions(user_id)
 
     def cleanup_expired_sessions(self):
-        self.repo.delete_expired_sessions()
+        return self.repo.delete_expired_sessions()
@@ -1,23 +1,99 @@
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from src.cores.buffered_writer import BufferedWriter
 from src.cores.config import settings
+from src.cores.database import SessionLocal
+from src.cores.fingerprint_cache import FingerprintEntry, LogFingerprint, fingerprint_cache
+from src.cores.pagination import cursor_page, decode_cursor
 from src.repositories.token_log_repository import TokenLogRepository
 from src.schemas.token_log import TokenLogCreate
 
 
+def _write_token_logs(rows: list[dict]) -> int:
+    db = SessionLocal()
+    try:
+        return TokenLogRepository(db).create_many(rows)
+    finally:
+        db.close()
+
+
+_token_log_writer: Optional[BufferedWriter] = None
+
+
+def get_token_log_writer() -> BufferedWriter:
+    global _token_log_writer
+    if _token_log_writer is None:
+        _token_log_writer = BufferedWriter(
+            _write_token_logs,
+            max_size=settings.TOKEN_LOG_QUEUE_MAX_SIZE,
+            batch_size=settings.TOKEN_LOG_BATCH_SIZE,
+            flush_seconds=settings.TOKEN_LOG_FLUSH_SECONDS,
+            policy=settings.TOKEN_LOG_QUEUE_FULL_POLICY,
+        )
+    return _token_log_writer
+
+
 class TokenLogService:
     def __init__(self, db: Session):
         self.repo = TokenLogRepository(db)
 
     def log_token_request(self, log_create: TokenLogCreate):
+        self._remember(log_create, datetime.now(timezone.utc))
         return self.repo.create(log_create)
 
+    def queue_token_request(self, log_create: TokenLogCreate) -> bool:
+        """
+        Đưa log vào hàng đợi của writer nền thay vì INSERT + COMMIT trong request.
+        Thời điểm được lấy lúc sự kiện xảy ra, không phải lúc flush.
+        """
+        timestamp = datetime.now(timezone.utc)
+        self._remember(log_create, timestamp)
+        return get_token_log_writer().submit({**log_create.model_dump(), "timestamp": timestamp})
+
+    def log_action(self, user_id: str, username: str, ip_address: str, user_agent: Optional[str], action: str):
+        """
+        Đưa log hành động vào hàng đợi; nếu bất thường so với lần trước thì thêm log "suspicious <action>".
+        """
+        log_data = TokenLogCreate(user_id=user_id, username=username, ip_address=ip_address, user_agent=user_agent, action=action)
+        # Log được writer nền ghi sau; is_suspicious so với log liền trước qua fingerprint cache
+        self.queue_token_request(log_data)
+
+        if self.is_suspicious(user_id, ip_address, user_agent, action):
+            self.queue_token_request(TokenLogCreate(**{**log_data.model_dump(), "action": f"suspicious {action}"}))
+
+    def _remember(self, log_create: TokenLogCreate, timestamp: datetime):
+        """
+        Cập nhật fingerprint cache trước khi ghi log: log mới thành last, last cũ thành previous.
+        """
+        if log_create.user_id is None:
+            return
+        entry = fingerprint_cache.get(log_create.user_id, log_create.action)
+        if entry is not None:
+            previous = entry.last
+        else:
+            recent_logs = self.repo.get_recent_logs(log_create.user_id, log_create.action, limit=1)
+            previous = LogFingerprint.from_log(recent_logs[0]) if recent_logs else None
+        current = LogFingerprint(ip_address=log_create.ip_address, user_agent=log_create.user_agent, timestamp=timestamp)
+        fingerprint_cache.set(log_create.user_id, log_create.action, FingerprintEntry(last=current, previous=previous))
+
     def get_paginated(self, skip: int = 0, limit: int = 200):
         return self.repo.get_paginated(skip, limit)
 
-    def is_suspicious(self, user_id: str, current_ip: str, current_agent: str, action: str) -> bool:
+    def get_page(self, cursor: str, limit: int = 200):
+        """
+        Trang log mới nhất trước theo cursor (timestamp, id). Trả về (logs, next_cursor).
+        """
+        rows = self.repo.get_page_after(decode_cursor(cursor), limit)
+        return cursor_page(rows, limit, lambda log: (log.timestamp, log.id))
+
+    def cleanup_expired_logs(self, retention_days: int) -> int:
+        expire_time = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        return self.repo.drop_expired_logs(expire_time)
+
+    def is_suspicious(self, user_id: str, current_ip: str, current_agent: str, action: str, current_logged: bool = True) -> bool:
         """
         Kiểm tra nếu hành động hiện tại có dấu hiệu bất thường.
 
@@ -26,20 +102,27 @@ class TokenLogService:
             current_ip (str): Địa chỉ IP hiện tại.
             current_agent (str): User agent hiện tại.
             action (str): Hành động ('login', 'refresh', ...).
+            current_logged (bool): Sự kiện hiện tại đã được ghi vào DB trước khi kiểm tra chưa.
 
         Returns:
             bool: True nếu phát hiện nghi vấn, False nếu không.
         """
-        last_log = self.repo.get_last_log(user_id, action)
-        if not last_log:
+        entry = fingerprint_cache.get(user_id, action)
+        if entry is not None:
+            # Sự kiện hiện tại đã được ghi thì nó là last: so với log liền trước nó
+            reference = entry.previous if current_logged else entry.last
+        else:
+            # Cache miss (worker mới khởi động, hết TTL): một query đi theo index (user_id, action, timestamp)
+            recent_logs = self.repo.get_recent_logs(user_id, action, limit=2 if current_logged else 1)
+            if current_logged:
+                recent_logs = recent_logs[1:]
+            reference = LogFingerprint.from_log(recent_logs[0]) if recent_logs else None
+        if reference is None:
             return False
 
-        ip_changed = last_log.ip_address != current_ip
-        agent_changed = last_log.user_agent != current_agent
-
-        # Đảm bảo last_log.timestamp là timezone-aware
-        last_timestamp = last_log.timestamp if last_log.timestamp.tzinfo else last_log.timestamp.replace(tzinfo=timezone.utc)
-        time_diff = datetime.now(timezone.utc) - last_timestamp
+        ip_changed = reference.ip_address != current_ip
+        agent_changed = reference.user_agent != current_agent
+        time_diff = datetime.now(timezone.utc) - reference.timestamp
 
         if action == "login":
             return self._is_login_suspicious(ip_changed, agent_changed, time_diff)
@@ -5,15 +5,20 @@ from sqlalchemy.orm import Session
 from starlette.responses import JSONResponse
 
 from src.cores import auth
+from src.cores.count_cache import count_cache
+from src.cores.pagination import cursor_page, decode_cursor, offset_page
+from src.cores.user_cache import user_status_cache
 from src.models.enums import RoleEnum
 from src.models.users import User
 from src.repositories.user_repository import UserRepository
 from src.schemas.users import PasswordChangeRequest, UserRead, UserReadAdmin, UserUpdateRequest
+from src.services.blacklist_token_service import BlacklistTokenService
 
 
 class UserService:
     def __init__(self, db: Session):
         self.repo = UserRepository(db)
+        self.blacklist_service = BlacklistTokenService(db)
 
     def get_user_by_id(self, user_id: str):
         user = self.repo.get(user_id)
@@ -64,14 +69,17 @@ class UserService:
     def block_user(self, user_id: str):
         user = self.get_user_by_id(user_id)
         self.repo.block_user(user)
+        user_status_cache.invalidate(user.username)
         return user
 
-    def get_all(self, page: int, limit: int, is_active: Optional[bool]):
+    def _count_users(self, name: Optional[str] = None, is_active: Optional[bool] = None, role: Optional[RoleEnum] = None) -> int:
+        return count_cache.get_or_load("users", (name, is_active, role), lambda: self.repo.count_users(name=name, is_active=is_active, role=role))
+
+    def get_all(self, page: int, limit: int, is_active: Optional[bool], include_total: bool = True):
         try:
             skip = (page - 1) * limit
-            total = self.repo.count_users(is_active=is_active)
-            users = self.repo.get_all(skip=skip, limit=limit, is_active=is_active)
-            last_page = (total - 1) // limit + 1
+            count = (lambda: self._count_users(is_active=is_active)) if include_total else None
+            users, total, last_page, has_next = offset_page(lambda skip, limit: self.repo.get_all(skip=skip, limit=limit, is_active=is_active, schema=UserRead), page, limit, count)
             return JSONResponse(
                 status_code=200,
                 content={
@@ -81,8 +89,8 @@ class UserService:
                     "pagination": {"total": total, "limit": limit, "offset": skip},
                     "link": {
                         "self": f"http://127.0.0.1:8000/api/v1/users?page={page}&limit={limit}&is_active={is_active}",
-                        "next": (f"http://127.0.0.1:8000/api/v1/users?page={page + 1}&limit={limit}&is_active={is_active}" if page < last_page else None),
-                        "last": f"http://127.0.0.1:8000/api/v1/users?page={last_page}&limit={limit}&is_active={is_active}",
+                        "next": (f"http://127.0.0.1:8000/api/v1/users?page={page + 1}&limit={limit}&is_active={is_active}" if has_next else None),
+                        "last": (f"http://127.0.0.1:8000/api/v1/users?page={last_page}&limit={limit}&is_active={is_active}" if last_page else None),
                     },
                 },
             )
@@ -106,7 +114,9 @@ class UserService:
         if not user.is_active:
             raise HTTPException(status_code=400, detail="User was already blocked")
         self.repo.block_user(user)
-        print(user.is_active)
+        user_status_cache.invalidate(user.username)
+        # User bị block không được dùng tiếp các access token đã cấp
+        self.blacklist_service.revoke_user_tokens(user.id)
         return user
 
     def unblock_user_for_admin(self, user_id: str):
@@ -114,13 +124,16 @@ class UserService:
         if user.is_active:
             raise HTTPException(status_code=400, detail="User was already unblocked")
         self.repo.unblock_user(user)
+        user_status_cache.invalidate(user.username)
         return user
 
     def delete_user(self, user_id: str):
         user = self.get_user_by_id_for_admin(user_id)
 
         try:
+            self.blacklist_service.revoke_user_tokens(user.id)
             self.repo.delete_user_and_posts(user)
+            user_status_cache.invalidate(user.username)
             return user
 
         except Exception as e:
@@ -129,6 +142,31 @@ class UserService:
                 detail=f"An error occurred while deleting the user: {str(e)}",
             )
 
+    def get_all_by_cursor(self, cursor: str, limit: int, is_active: Optional[bool]):
+        after = decode_cursor(cursor)
+        try:
+            rows = self.repo.get_page_after(after, limit, is_active=is_active, schema=UserRead)
+            users, next_cursor = cursor_page(rows, limit, lambda user: (user.created_at, user.id))
+            return JSONResponse(
+                status_code=200,
+                content={
+                    "status_code": 200,
+                    "message": "Get Users Successfully",
+                    "data": [UserRead.model_validate(user).model_dump() for user in users],
+                    "pagination": {"limit": limit, "next_cursor": next_cursor},
+                    "link": {
+                        "self": f"http://127.0.0.1:8000/api/v1/users?cursor={cursor}&limit={limit}&is_active={is_active}",
+                        "next": (f"http://127.0.0.1:8000/api/v1/users?cursor={next_cursor}&limit={limit}&is_active={is_active}" if next_cursor else None),
+                    },
+                },
+            )
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"An error occurred while retrieving users: {str(e)}",
+            )
+
     def get_all_for_admin(
         self,
         page: int,
@@ -136,12 +174,13 @@ class UserService:
         name: Optional[str] = None,
         is_active: Optional[bool] = None,
         role: Optional[RoleEnum] = None,
+        include_total: bool = True,
     ):
         skip = (page - 1) * limit
-        users = self.repo.get_all(skip=skip, limit=limit, name=name, is_active=is_active, role=role)
-        total = self.repo.count_users(name=name, is_active=is_active, role=role)
-
-        last_page = (total - 1) // limit + 1
+        count = (lambda: self._count_users(name=name, is_active=is_active, role=role)) if include_total else None
+        users, total, last_page, has_next = offset_page(
+            lambda skip, limit: self.repo.get_all(skip=skip, limit=limit, name=name, is_active=is_active, role=role, schema=UserReadAdmin), page, limit, count
+        )
 
         return {
             "status_code": 200,
@@ -150,7 +189,29 @@ class UserService:
             "pagination": {"total": total, "limit": limit, "offset": skip},
             "link": {
                 "self": f"http://127.0.0.1:8000/api/v1/admin?page={page}&limit={limit}&name={name}&is_active={is_active}",
-                "next": (f"http://127.0.0.1:8000/api/v1/admin?page={page + 1}&limit={limit}&name={name}&is_active={is_active}" if page < last_page else None),
-                "last": f"http://127.0.0.1:8000/api/v1/admin?page={last_page}&limit={limit}&name={name}&is_active={is_active}",
+                "next": (f"http://127.0.0.1:8000/api/v1/admin?page={page + 1}&limit={limit}&name={name}&is_active={is_active}" if has_next else None),
+                "last": (f"http://127.0.0.1:8000/api/v1/admin?page={last_page}&limit={limit}&name={name}&is_active={is_active}" if last_page else None),
+            },
+        }
+
+    def get_all_for_admin_by_cursor(
+        self,
+        cursor: str,
+        limit: int,
+        name: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        role: Optional[RoleEnum] = None,
+    ):
+        rows = self.repo.get_page_after(decode_cursor(cursor), limit, name=name, is_active=is_active, role=role, schema=UserReadAdmin)
+        users, next_cursor = cursor_page(rows, limit, lambda user: (user.created_at, user.id))
+
+        return {
+            "status_code": 200,
+            "message": "Success",
+            "data": [UserReadAdmin.model_validate(user).model_dump() for user in users],
+            "pagination": {"limit": limit, "next_cursor": next_cursor},
+            "link": {
+                "self": f"http://127.0.0.1:8000/api/v1/admin?cursor={cursor}&limit={limit}&name={name}&is_active={is_active}",
+                "next": (f"http://127.0.0.1:8000/api/v1/admin?cursor={next_cursor}&limit={limit}&name={name}&is_active={is_active}" if next_cursor else None),
             },
         }
@@ -1,11 +1,14 @@
 import os
+from contextlib import contextmanager
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 import tests.load_env  # noqa: F401
+from src.cores.count_cache import count_cache
 from src.cores.database import Base
+from src.cores.token_cache import verified_token_cache
 
 TEST_DATABASE_URL = os.getenv("DATABASE_URL")
 test_engine = create_engine(
@@ -24,6 +27,20 @@ def setup_test_db():
     Base.metadata.drop_all(bind=test_engine)
 
 
+# Tổng số dòng được cache theo module: mỗi test bắt đầu với cache rỗng
+@pytest.fixture(autouse=True)
+def clear_count_cache():
+    count_cache.clear()
+    yield
+
+
+# JWT đã verify được cache theo digest: test tự ký token không được thấy claims của test trước
+@pytest.fixture(autouse=True)
+def clear_verified_token_cache():
+    verified_token_cache.clear()
+    yield
+
+
 # Dependency override
 def get_test_db():
     db = TestSessionLocal()
@@ -31,3 +48,31 @@ def get_test_db():
         yield db
     finally:
         db.close()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements: list[str] = []
+
+
+@contextmanager
+def count_queries(bind=test_engine):
+    """
+    Đếm số câu SQL chạy trên bind trong khối with, dùng để bắt lỗi N+1:
+
+        with count_queries() as queries:
+            ...
+        assert queries.count == 2
+    """
+    counter = QueryCounter()
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.count += 1
+        counter.statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(bind, "before_cursor_execute", _before_cursor_execute)
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta, timezone
 import pytest
 from fastapi import HTTPException
 
+from src.cores.auth import token_digest
 from src.models import User
 from src.models.active_access_tokens import ActiveAccessToken
 from src.models.enums import GenderEnum, RoleEnum
@@ -62,14 +63,14 @@ def sample_active_access_tokens(db_session):
         ActiveAccessToken(
             id=1,
             user_id="user4",
-            access_token="token1",
+            token_hash=token_digest("token1"),
             created_at=datetime.now(timezone.utc),
             expires_at=datetime.now(timezone.utc) + timedelta(minutes=30),  # Assuming this constant is defined in settings
         ),
         ActiveAccessToken(
             id=4,
             user_id="user4",
-            access_token="token4",
+            token_hash=token_digest("token4"),
             created_at=datetime.now(timezone.utc),
             expires_at=datetime.now(timezone.utc) + timedelta(minutes=30),
             # Assuming this constant is defined in settings
@@ -77,21 +78,21 @@ def sample_active_access_tokens(db_session):
         ActiveAccessToken(
             id=2,
             user_id="user5",
-            access_token="token2",
+            token_hash=token_digest("token2"),
             created_at=datetime.now(timezone.utc),
             expires_at=datetime.now(timezone.utc) + timedelta(minutes=30),
         ),
         ActiveAccessToken(
             id=3,
             user_id="user7",
-            access_token="token3",
+            token_hash=token_digest("token3"),
             created_at=datetime.now(timezone.utc),
             expires_at=datetime.now(timezone.utc) - timedelta(minutes=30),
         ),
         ActiveAccessToken(
             id=5,
             user_id="user7",
-            access_token="expired_token",
+            token_hash=token_digest("expired_token"),
             created_at=datetime.now(timezone.utc) - timedelta(days=1),  # Expired token
             expires_at=datetime.now(timezone.utc) - timedelta(days=1),
         ),
@@ -114,7 +115,7 @@ def test_should_create_active_access_token_when_data_valid(active_access_token_s
     response = active_access_token_service.create_token(token_data)
 
     assert response.user_id == "user4"
-    assert response.access_token == "new_token"
+    assert response.token_hash == token_digest("new_token")
 
 
 def test_should_get_active_access_tokens_when_get_by_user_id(
@@ -124,9 +125,9 @@ def test_should_get_active_access_tokens_when_get_by_user_id(
 
     assert len(response) == 3
     assert response[0].user_id == "user4"
-    assert response[0].access_token == "token1"
-    assert response[1].access_token == "token4"
-    assert response[2].access_token == "new_token"  # The newly created token
+    assert response[0].token_hash == token_digest("token1")
+    assert response[1].token_hash == token_digest("token4")
+    assert response[2].token_hash == token_digest("new_token")  # The newly created token
 
 
 def test_should_return_true_when_delete_token_success(active_access_token_service):
@@ -1,9 +1,22 @@
+import uuid
+from unittest.mock import MagicMock
+
 import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+from sqlalchemy import event
+from starlette.requests import Request
 
+from src.cores import auth
+from src.cores.auth_context import get_auth_context
+from src.cores.config import settings
+from src.cores.dependencies import get_current_user
+from src.cores.fingerprint_cache import fingerprint_cache
 from src.models.enums import GenderEnum
 from src.schemas.users import UserCreate
 from src.services.auth_service import AuthService
-from tests.conftest import get_test_db
+from src.services.token_log_service import get_token_log_writer
+from tests.conftest import count_queries, get_test_db
 
 
 @pytest.fixture
@@ -18,6 +31,23 @@ def auth_service(db_session):
     return AuthService(db=db_session)
 
 
+@pytest.fixture
+def login_user(auth_service):
+    # Mỗi test login có user riêng, không phụ thuộc thứ tự chạy
+    username = f"login-{uuid.uuid4().hex[:12]}"
+    auth_service.register_user(
+        UserCreate(
+            username=username,
+            email=f"{username}@gmail.com",  # type: ignore
+            password="password123",
+            fullname="Login User",
+            gender=GenderEnum.female,
+        )
+    )
+    fingerprint_cache.clear()
+    return username
+
+
 def test_should_return_user_when_data_valid(auth_service):
     user_data = UserCreate(
         username="newuser",
@@ -56,3 +86,77 @@ def test_should_raise_400_when_register_user_email_already(auth_service):
     with pytest.raises(Exception) as exc_info:
         auth_service.register_user(user_data)
     assert "Email already exists" in str(exc_info.value)
+
+
+def test_should_reuse_auth_context_when_middleware_already_loaded_user():
+    request = Request({"type": "http", "headers": [(b"authorization", b"Bearer token-abc")]})
+    context = get_auth_context(request)
+    loaded_user = object()
+    context.user = loaded_user
+    db = MagicMock()
+
+    assert context.token == "token-abc"
+    assert get_current_user(request, token="token-abc", db=db) is loaded_user
+    db.query.assert_not_called()
+
+
+def test_should_rehash_password_when_login_with_outdated_cost(auth_service):
+    user = auth_service.register_user(
+        UserCreate(
+            username="legacycost",
+            email="legacy@gmail.com",  # type: ignore
+            password="password123",
+            fullname="Legacy Cost",
+            gender=GenderEnum.male,
+        )
+    )
+    outdated_hash = bcrypt.using(rounds=4).hash("password123")
+    auth_service.repo.update_password(user, outdated_hash)
+
+    assert auth_service.verify_password_and_rehash(user, "wrong-password") is False
+    assert user.password == outdated_hash
+
+    assert auth_service.verify_password_and_rehash(user, "password123") is True
+    assert user.password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert not auth.pwd_context.needs_update(user.password)
+
+
+def test_should_login_with_single_commit_and_few_round_trips(auth_service, login_user, db_session, mocker):
+    # Như khi app chạy: audit log chỉ vào hàng đợi của writer nền, không ghi trong request
+    submit = mocker.patch.object(get_token_log_writer(), "submit")
+    commits = []
+    event.listen(db_session, "after_commit", commits.append)
+
+    with count_queries() as queries:
+        result = auth_service.login(login_user, "password123", "10.0.0.1", "pytest")
+
+    # SELECT user, SELECT log liền trước (fingerprint cache miss), INSERT token, INSERT session
+    assert len(commits) == 1
+    assert queries.count <= 4
+    assert result.username == login_user
+    assert submit.call_args.args[0]["action"] == "login"
+    assert auth.decode_token(result.access_token)["sub"] == login_user
+
+
+def test_should_raise_401_without_writes_when_login_password_wrong(auth_service, login_user, db_session, mocker):
+    submit = mocker.patch.object(get_token_log_writer(), "submit")
+    commits = []
+    event.listen(db_session, "after_commit", commits.append)
+
+    with pytest.raises(HTTPException) as exc_info:
+        auth_service.login(login_user, "wrong-password", "10.0.0.1", "pytest")
+
+    assert exc_info.value.detail == "Invalid credentials"
+    assert commits == []
+    assert submit.call_args.args[0]["action"] == "login failed"
+
+
+def test_should_not_log_login_when_session_commit_fails(auth_service, login_user, db_session, mocker):
+    submit = mocker.patch.object(get_token_log_writer(), "submit")
+    mocker.patch.object(db_session, "commit", side_effect=RuntimeError("commit failed"))
+
+    with pytest.raises(HTTPException) as exc_info:
+        auth_service.login(login_user, "password123", "10.0.0.1", "pytest")
+
+    assert exc_info.value.detail == "Session creation failed"
+    submit.assert_not_called()
@@ -1,7 +1,13 @@
+import asyncio
+
 import pytest
 
-from src.services.blacklist_token_service import BlacklistTokenService
-from tests.conftest import get_test_db
+from src.cores.auth import token_digest
+from src.cores.database import AsyncSessionLocal, get_async_engine
+from src.cores.revocation_cache import BloomFilter, RevocationCache
+from src.models.active_access_tokens import ActiveAccessToken
+from src.services.blacklist_token_service import AsyncBlacklistTokenService, BlacklistTokenService
+from tests.conftest import count_queries, get_test_db
 
 
 @pytest.fixture
@@ -19,7 +25,7 @@ def blacklist_token_service(db_session):
 def test_should_return_blacklisted_token_when_created(blacklist_token_service):
     token = "test_token"
     response = blacklist_token_service.blacklist_token(token)
-    assert response.token == token
+    assert response.token_hash == token_digest(token)
 
 
 def test_should_return_true_when_token_is_blacklisted(blacklist_token_service):
@@ -40,3 +46,113 @@ def test_should_return_quantity_delete_when_cleanup_expired_tokens(
     response = blacklist_token_service.cleanup_expired_tokens(expire_minutes)
     assert isinstance(response, int)  # Kiểm tra xem response là số lượng token đã xóa
     assert response >= 0  # Số lượng xóa không thể âm
+
+
+def _new_cache():
+    return RevocationCache(capacity=1000, error_rate=0.001, max_confirmed=10, sync_seconds=0)
+
+
+def test_should_have_no_false_negatives_when_items_added_to_bloom_filter():
+    bloom = BloomFilter(capacity=1000)
+    tokens = [f"token_{i}".encode() for i in range(1000)]
+    for token in tokens:
+        bloom.add(token)
+
+    assert all(bloom.might_contain(token) for token in tokens)
+
+
+def test_should_skip_db_lookup_when_bloom_filter_says_not_revoked(db_session, monkeypatch):
+    service = BlacklistTokenService(db=db_session, cache=_new_cache())
+    calls = []
+    monkeypatch.setattr(service.repo, "is_hash_blacklisted", lambda token_hash: calls.append(token_hash) or False)
+
+    assert service.is_token_blacklisted("never_revoked_token") is False
+    assert calls == []
+
+
+def test_should_serve_confirmed_hit_from_cache_when_token_checked_twice(db_session, monkeypatch):
+    service = BlacklistTokenService(db=db_session, cache=_new_cache())
+    service.blacklist_token("revoked_twice_token")
+    assert service.is_token_blacklisted("revoked_twice_token") is True
+
+    monkeypatch.setattr(service.repo, "is_hash_blacklisted", lambda token_hash: pytest.fail("unexpected DB lookup"))
+    assert service.is_token_blacklisted("revoked_twice_token") is True
+
+
+def test_should_see_token_revoked_by_other_worker_when_cache_syncs(db_session):
+    reader = BlacklistTokenService(db=db_session, cache=_new_cache())
+    writer = BlacklistTokenService(db=db_session, cache=_new_cache())
+    assert reader.is_token_blacklisted("other_worker_token") is False
+
+    writer.blacklist_token("other_worker_token")
+
+    assert reader.is_token_blacklisted("other_worker_token") is True
+
+
+def test_should_load_lower_id_committed_late_when_cache_syncs():
+    class FakeRepo:
+        rows = [(1, b"first"), (3, b"third")]
+
+        def get_min_id(self):
+            return min((row[0] for row in self.rows), default=None)
+
+        def get_hashes_after(self, last_id):
+            return [row for row in self.rows if row[0] > last_id]
+
+    repo = FakeRepo()
+    cache = _new_cache()
+    cache.sync(repo)
+    assert not cache.might_contain(b"second")
+
+    # transaction giữ id 2 commit sau khi đã đồng bộ tới id 3
+    repo.rows.append((2, b"second"))
+    cache.sync(repo)
+
+    assert cache.might_contain(b"second")
+
+
+def test_should_rebuild_filter_on_other_worker_when_leader_cleans_up(db_session):
+    leader = BlacklistTokenService(db=db_session, cache=_new_cache())
+    follower = BlacklistTokenService(db=db_session, cache=_new_cache())
+    leader.blacklist_token("expired_revoked_token")
+    assert follower.is_token_blacklisted("expired_revoked_token") is True
+
+    # Chỉ leader chạy cleanup; expire_minutes=0 xóa mọi dòng đã có
+    assert leader.cleanup_expired_tokens(expire_minutes=0) > 0
+
+    assert follower.is_token_blacklisted("expired_revoked_token") is False
+    assert not follower.cache.might_contain(token_digest("expired_revoked_token"))
+
+
+def test_should_detect_revoked_token_when_using_async_service():
+    async def scenario():
+        try:
+            async with AsyncSessionLocal() as db:
+                service = AsyncBlacklistTokenService(db, cache=_new_cache())
+                await service.blacklist_token("async_revoked_token")
+                return (
+                    await service.is_token_blacklisted("async_revoked_token"),
+                    await service.is_token_blacklisted("async_unknown_token"),
+                )
+        finally:
+            await get_async_engine().dispose()
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_should_revoke_all_user_tokens_in_constant_round_trips(db_session):
+    tokens = [f"bulk-token-{i}" for i in range(300)]
+    db_session.add_all(ActiveAccessToken(user_id="bulk-user", token_hash=token_digest(token)) for token in tokens)
+    db_session.commit()
+    service = BlacklistTokenService(db_session, cache=_new_cache())
+    service.blacklist_token(tokens[0])  # đã thu hồi trước đó: không được chèn trùng
+
+    with count_queries() as queries:
+        revoked = service.revoke_user_tokens("bulk-user")
+
+    # INSERT ... SELECT, DELETE, nạp hash mới vào revocation cache
+    assert queries.count == 3
+    assert revoked == len(tokens) - 1
+    assert db_session.query(ActiveAccessToken).filter_by(user_id="bulk-user").count() == 0
+    assert all(service.is_token_blacklisted(token) for token in tokens)
+    assert service.revoke_user_tokens("bulk-user") == 0
@@ -0,0 +1,64 @@
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.cores.config import settings
+from src.cores.database import SessionLocal, engine, get_pool_stats
+from src.cores.dependencies import get_db
+from src.cores.request_session import current_connection_count, get_request_sessions, track_connections
+from src.middlewares.db_session import DbSessionMiddleware
+
+
+def test_should_apply_pool_settings_when_engine_created():
+    assert engine.pool.size() == settings.DB_POOL_SIZE
+    assert engine.pool._recycle == settings.DB_POOL_RECYCLE
+    assert engine.pool._pre_ping is settings.DB_POOL_PRE_PING
+
+
+def test_should_report_checked_out_connection_when_session_in_use():
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT 1"))
+        stats = get_pool_stats()["sync"]
+        assert stats["checked_out"] >= 1
+        assert stats["checkouts"] >= 1
+        assert stats["max_wait_ms"] >= 0
+    finally:
+        db.close()
+
+    assert get_pool_stats()["sync"]["checked_out"] == 0
+
+
+def test_should_share_one_session_per_request_when_db_session_middleware_installed():
+    app = FastAPI()
+    app.add_middleware(DbSessionMiddleware)
+    seen = {}
+
+    def first(db: Session = Depends(get_db)):
+        db.execute(text("SELECT 1"))
+        return db
+
+    @app.get("/probe")
+    def probe(request: Request, db: Session = Depends(get_db), other=Depends(first)):
+        db.execute(text("SELECT 1"))
+        seen["same_session"] = db is other is get_request_sessions(request.state).sync
+        seen["connections"] = current_connection_count()
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        assert client.get("/probe").status_code == 200
+
+    assert seen == {"same_session": True, "connections": 1}
+    assert get_pool_stats()["sync"]["checked_out"] == 0
+
+
+def test_should_open_private_session_when_get_db_called_outside_request():
+    db_gen = get_db()
+    db = next(db_gen)
+    with track_connections() as counter:
+        db.execute(text("SELECT 1"))
+    db_gen.close()
+
+    assert counter.checkouts == 1
+    assert get_pool_stats()["sync"]["checked_out"] == 0
@@ -0,0 +1,61 @@
+import asyncio
+
+from sqlalchemy import text
+
+from src.cores.maintenance import LeaderLock, MaintenanceScheduler, MaintenanceTask
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_should_allow_single_leader_when_workers_share_lock_file(tmp_path):
+    path = str(tmp_path / "maintenance.lock")
+    leader, follower = LeaderLock(path), LeaderLock(path)
+
+    assert leader.try_acquire() is True
+    assert follower.try_acquire() is False
+
+    leader.release()
+    assert follower.try_acquire() is True
+    follower.release()
+
+
+def test_should_record_metrics_and_reschedule_when_task_runs(tmp_path):
+    clock = FakeClock()
+    scheduler = MaintenanceScheduler(LeaderLock(str(tmp_path / "lock")), clock=clock)
+    task = MaintenanceTask("cleanup", lambda db: db.execute(text("SELECT 7")).scalar(), interval_seconds=60, jitter_seconds=5)
+    scheduler.register(task)
+
+    asyncio.run(scheduler.run_pending())
+
+    assert task.runs == 1
+    assert task.last_rows_deleted == 7
+    assert task.last_duration_ms >= 0
+    assert clock.now + 60 <= task.next_run_at <= clock.now + 65
+
+    # Chưa đến hạn thì không chạy lại
+    asyncio.run(scheduler.run_pending())
+    assert task.runs == 1
+
+
+def test_should_keep_scheduling_when_task_fails(tmp_path):
+    clock = FakeClock()
+    scheduler = MaintenanceScheduler(LeaderLock(str(tmp_path / "lock")), clock=clock)
+
+    def broken(db):
+        raise RuntimeError("boom")
+
+    task = MaintenanceTask("broken", broken, interval_seconds=30)
+    scheduler.register(task)
+
+    asyncio.run(scheduler.run_pending())
+
+    snapshot = scheduler.snapshot()["tasks"][0]
+    assert snapshot["failures"] == 1
+    assert snapshot["last_error"] == "boom"
+    assert task.next_run_at == clock.now + 30
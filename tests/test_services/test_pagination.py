@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from src.cores.pagination import cursor_page, decode_cursor, encode_cursor
+
+
+def test_should_round_trip_cursor_when_encoded():
+    created_at = datetime(2026, 10, 17, 12, 30, 5, 123456)
+
+    assert decode_cursor(encode_cursor(created_at, "post-1")) == (created_at, "post-1")
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    assert decode_cursor("") is None
+
+
+def test_should_return_next_cursor_only_when_more_rows_exist():
+    rows = [(datetime(2026, 1, 3), "c"), (datetime(2026, 1, 2), "b"), (datetime(2026, 1, 1), "a")]
+
+    items, next_cursor = cursor_page(rows, 2, lambda row: row)
+    assert items == rows[:2]
+    assert decode_cursor(next_cursor) == rows[1]
+
+    assert cursor_page(rows, 3, lambda row: row) == (rows, None)
+
+
+def test_should_round_trip_cursor_when_key_is_relevance_score():
+    assert decode_cursor(encode_cursor(1.25, "post-1")) == (1.25, "post-1")
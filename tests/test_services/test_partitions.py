@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+
+from src.cores.partitions import (
+    TOKEN_LOG_PARTITIONS,
+    TOKEN_USAGE_LOG_PARTITIONS,
+    is_partitioned,
+    parse_partition_bound,
+    partition_definitions,
+    plan_future_bounds,
+)
+from tests.conftest import get_test_db
+
+NOW = datetime(2026, 10, 17, 12, 25, tzinfo=timezone.utc)
+
+
+def test_should_plan_hourly_partitions_ahead_when_table_has_none():
+    spec = TOKEN_USAGE_LOG_PARTITIONS
+
+    bounds = plan_future_bounds(spec, None, NOW)
+
+    assert bounds[0] == datetime(2026, 10, 17, 13)
+    assert bounds[-1] == datetime(2026, 10, 17, 13) + timedelta(hours=spec.ahead)
+    assert spec.name(bounds[0]) == "p2026101713"
+
+
+def test_should_only_add_missing_partitions_when_some_exist():
+    spec = TOKEN_LOG_PARTITIONS
+    last_bound = datetime(2026, 10, 18) + timedelta(days=spec.ahead - 1)
+
+    assert plan_future_bounds(spec, last_bound, NOW) == [last_bound + timedelta(days=1)]
+    assert plan_future_bounds(spec, last_bound + timedelta(days=1), NOW) == []
+
+
+def test_should_render_partition_clause_with_maxvalue_last():
+    clause = partition_definitions(TOKEN_LOG_PARTITIONS, [datetime(2026, 10, 18)])
+
+    assert clause == "PARTITION p20261018 VALUES LESS THAN ('2026-10-18 00:00:00'), PARTITION pmax VALUES LESS THAN (MAXVALUE)"
+    assert parse_partition_bound("'2026-10-18 00:00:00'") == datetime(2026, 10, 18)
+    assert parse_partition_bound("MAXVALUE") is None
+
+
+def test_should_not_be_partitioned_when_table_not_migrated():
+    db = next(get_test_db())
+    try:
+        assert is_partitioned(db, TOKEN_USAGE_LOG_PARTITIONS.table) is False
+    finally:
+        db.close()
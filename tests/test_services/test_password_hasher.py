@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from src.cores import auth
+from src.cores.config import settings
+from src.cores.password_hasher import HashingExecutor, plan_pool_size
+
+
+@pytest.fixture
+def hasher():
+    executor = HashingExecutor(max_workers=1, max_pending=1, queue_timeout=0.2)
+    yield executor
+    executor.shutdown()
+
+
+def _occupy(hasher: HashingExecutor, release: threading.Event) -> threading.Thread:
+    started = threading.Event()
+
+    def work():
+        started.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=hasher.run, args=(work,))
+    thread.start()
+    assert started.wait(5)
+    return thread
+
+
+def test_should_verify_password_through_executor_when_hashing():
+    hashed = auth.get_password_hash("secret-password")
+
+    assert auth.verify_password("secret-password", hashed)
+    assert not auth.verify_password("wrong-password", hashed)
+
+
+def test_should_return_503_when_queued_longer_than_timeout(hasher):
+    release = threading.Event()
+    worker = _occupy(hasher, release)
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            hasher.run(lambda: "never")
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"] == "1"
+    finally:
+        release.set()
+        worker.join()
+
+    assert hasher.snapshot()["timed_out"] == 1
+    assert hasher.run(lambda: "ok") == "ok"
+    assert hasher.snapshot()["in_flight"] == 0
+
+
+def test_should_reject_immediately_when_pool_and_queue_are_full(hasher):
+    release = threading.Event()
+    running = _occupy(hasher, release)
+    queued = threading.Thread(target=hasher.run, args=(lambda: None,))
+    queued.start()
+    try:
+        while hasher.snapshot()["in_flight"] < 2:
+            pass
+        with pytest.raises(HTTPException) as exc_info:
+            hasher.run(lambda: None)
+        assert exc_info.value.status_code == 503
+    finally:
+        release.set()
+        running.join()
+        queued.join()
+
+    assert hasher.snapshot()["rejected"] == 1
+
+
+def test_should_leave_anyio_threads_free_when_pool_uses_defaults(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", None)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", None)
+
+    for cpu_count in (1, 4, 24, 128):
+        workers, pending = plan_pool_size(threadpool_tokens=40, cpu_count=cpu_count)
+        assert 1 <= workers <= cpu_count
+        assert workers + pending <= 40 * settings.PASSWORD_HASH_THREADPOOL_SHARE
+
+
+def test_should_reject_pool_size_when_it_can_hold_every_anyio_thread(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 24)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 16)
+
+    with pytest.raises(ValueError):
+        plan_pool_size(threadpool_tokens=40, cpu_count=24)
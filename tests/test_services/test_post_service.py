@@ -1,13 +1,19 @@
+import asyncio
 import json
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy.dialects import mysql
 
+from src.cores.database import AsyncSessionLocal, get_async_engine
+from src.cores.pagination import encode_cursor
+from src.cores.search_index import MODE_NATURAL, ORDER_RELEVANCE
 from src.models import Category, Post, User
 from src.models.enums import GenderEnum, RoleEnum
-from src.schemas.posts import PostCreate, PostUpdate
-from src.services.post_service import PostService
-from tests.conftest import get_test_db
+from src.repositories.post_repository import PostRepository
+from src.schemas.posts import PostCreate, PostRead, PostUpdate
+from src.services.post_service import AsyncPostService, PostService
+from tests.conftest import count_queries, get_test_db
 
 
 @pytest.fixture
@@ -123,6 +129,36 @@ def test_should_return_all_posts_by_user_id(post_service):
     assert response[0].title == "Post 1"
 
 
+def _run_async_post_service(method: str, *args):
+    async def scenario():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await getattr(AsyncPostService(db), method)(*args)
+        finally:
+            await get_async_engine().dispose()
+
+    return asyncio.run(scenario())
+
+
+def test_should_return_post_with_categories_when_using_async_service():
+    post = _run_async_post_service("get_post_by_id", "1")
+
+    data = PostRead.model_validate(post)
+    assert data.id == "1"
+    assert {c.name for c in data.categories} == {"Category 3", "Category 4"}
+
+
+def test_should_return_403_when_async_post_belongs_to_blocked_user():
+    with pytest.raises(HTTPException) as exc_info:
+        _run_async_post_service("get_post_by_id", "3")
+    assert exc_info.value.status_code == 403
+
+
+def test_should_return_all_posts_by_user_id_when_using_async_service():
+    posts = _run_async_post_service("get_posts_by_user_id", "user1")
+    assert [post.id for post in posts] == ["1"]
+
+
 def test_should_return_post_when_created_successfully(post_service):
     post_data = PostCreate(title="New Post", content="This is a new post", category_ids=["3", "4"])
     response = post_service.create_post(post_data, user_id="user1")
@@ -195,6 +231,60 @@ def test_should_return_200_when_get_all_posts_success(post_service):
     assert content["data"][0]["title"] == "Post 1"
 
 
+def test_should_reuse_cached_total_until_post_created(post_service, mocker):
+    count_spy = mocker.spy(post_service.post_repo, "count_posts")
+
+    first = json.loads(post_service.get_all(page=1, limit=10).body.decode())
+    post_service.get_all(page=2, limit=10)
+    assert count_spy.call_count == 1
+
+    post_service.create_post(PostCreate(title="Counted", content="c", category_ids=[]), "user1")
+    refreshed = json.loads(post_service.get_all(page=1, limit=10).body.decode())
+    assert count_spy.call_count == 2
+    assert refreshed["pagination"]["total"] == first["pagination"]["total"] + 1
+
+
+def test_should_skip_count_when_include_total_false(post_service, mocker):
+    count_spy = mocker.spy(post_service.post_repo, "count_posts")
+
+    content = json.loads(post_service.get_all(page=1, limit=1, include_total=False).body.decode())
+
+    assert count_spy.call_count == 0
+    assert content["pagination"]["total"] is None
+    assert content["link"]["last"] is None
+    assert content["link"]["next"] is not None
+
+
+def test_should_load_categories_with_fixed_query_count_when_listing_posts(post_service):
+    with count_queries() as small_page:
+        post_service.get_all(page=1, limit=1, include_total=False)
+    with count_queries() as large_page:
+        content = json.loads(post_service.get_all(page=1, limit=100, include_total=False).body.decode())
+
+    assert len(content["data"]) > 1
+    assert large_page.count == small_page.count == 2  # posts + categories (selectinload)
+
+
+def test_should_walk_all_posts_without_duplicates_when_paging_by_cursor(post_service):
+    expected = post_service.get_all(page=1, limit=100)
+    total = json.loads(expected.body.decode())["pagination"]["total"]
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        content = json.loads(post_service.get_all_by_cursor(cursor, limit=2).body.decode())
+        assert len(content["data"]) <= 2
+        seen += [post["id"] for post in content["data"]]
+        cursor = content["pagination"]["next_cursor"]
+
+    assert len(seen) == len(set(seen)) == total
+
+
+def test_should_raise_400_when_cursor_invalid(post_service):
+    with pytest.raises(HTTPException) as exc_info:
+        post_service.get_all_by_cursor("not-a-cursor", limit=2)
+    assert exc_info.value.status_code == 400
+
+
 def test_should_return_400_when_get_all_posts_failed(post_service, mocker):
     # Giả lập post_repo.count_posts raise Exception
     mocker.patch.object(post_service.post_repo, "count_posts", side_effect=Exception("Mocked DB error"))
@@ -285,3 +375,47 @@ def test_should_raise_400_when_invalid_category_ids(post_service):
     assert exc_info.value.status_code == 400
 
     assert "Invalid category IDs: ['999', '998']" in exc_info.value.detail
+
+
+def test_should_rank_and_filter_posts_when_searching(post_service):
+    post_service.create_post(PostCreate(title="Kubernetes guide", content="kubernetes kubernetes operators", category_ids=["3"]), "user1")
+    post_service.create_post(PostCreate(title="Kubernetes notes", content="short notes", category_ids=[]), "user1")
+
+    content = json.loads(post_service.search("kubernetes").body.decode())
+    assert [post["title"] for post in content["data"]] == ["Kubernetes guide", "Kubernetes notes"]
+    assert content["data"][0]["score"] > content["data"][1]["score"]
+
+    filtered = json.loads(post_service.search("kubernetes", category_id="3").body.decode())
+    assert [post["title"] for post in filtered["data"]] == ["Kubernetes guide"]
+    assert json.loads(post_service.search("kubernetes", user_id="user2").body.decode())["data"] == []
+
+
+def test_should_page_search_results_by_cursor(post_service):
+    titles = ["Zeppelin history", "Zeppelin models", "Zeppelin museum"]
+    for title in titles:
+        post_service.create_post(PostCreate(title=title, content="zeppelin", category_ids=[]), "user1")
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        content = json.loads(post_service.search("zeppelin", cursor=cursor, limit=1).body.decode())
+        seen += [post["title"] for post in content["data"]]
+        cursor = content["pagination"]["next_cursor"]
+
+    assert len(seen) == len(set(seen)) == len(titles)
+    assert set(seen) == set(titles)
+
+    with pytest.raises(HTTPException) as exc_info:
+        post_service.search("zeppelin", cursor=encode_cursor(1.0, "1"), order="recent")
+    assert exc_info.value.status_code == 400
+
+
+def test_should_compare_rounded_score_when_paging_mysql_search(db_session):
+    query = PostRepository(db_session)._fulltext_query("kubernetes", MODE_NATURAL, (1.5, "9"), 10, ORDER_RELEVANCE, None, None)
+    sql = str(query.statement.compile(dialect=mysql.dialect()))
+    select_part, rest = sql.split("FROM", 1)
+    where_part, order_part = rest.split("ORDER BY", 1)
+
+    # Cùng một biểu thức ROUND(MATCH ...) trong SELECT (giá trị đưa vào cursor), WHERE và ORDER BY
+    assert "round(MATCH" in select_part
+    assert where_part.count("round(MATCH") == 2
+    assert order_part.strip().startswith("round(MATCH")
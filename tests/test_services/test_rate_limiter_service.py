@@ -1,8 +1,12 @@
-from datetime import datetime, timezone
+import multiprocessing
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
+from src.cores.auth import token_digest
+from src.cores.rate_limit import InMemoryRateLimitBackend, SharedMemoryRateLimitBackend, SqlRateLimitBackend
 from src.models import TokenUsageLog
+from src.repositories.rate_limiter_repository import RateLimiterRepository
 from src.services.blacklist_token_service import BlacklistTokenService
 from src.services.rate_limiter_service import RateLimiterService
 from tests.conftest import get_test_db
@@ -17,9 +21,9 @@ def db_session():
 
 @pytest.fixture
 def sample_token_usage(db_session):
-    token_usage = [TokenUsageLog(id=i, token="test_token1", requested_at=datetime.now(timezone.utc)) for i in range(1, 12)]
+    token_usage = [TokenUsageLog(id=i, token_hash=token_digest("test_token1"), requested_at=datetime.now(timezone.utc)) for i in range(1, 12)]
     # Create 11 entries for "test_token1" to simulate rate limiting
-    token_usage += [TokenUsageLog(id=i + 21, token="test_token2", requested_at=datetime.now(timezone.utc)) for i in range(1, 6)]  # 5 entries for "test_token2"
+    token_usage += [TokenUsageLog(id=i + 21, token_hash=token_digest("test_token2"), requested_at=datetime.now(timezone.utc)) for i in range(1, 6)]  # 5 entries for "test_token2"
 
     db_session.add_all(token_usage)
     db_session.commit()
@@ -28,7 +32,12 @@ def sample_token_usage(db_session):
 
 @pytest.fixture
 def rate_limiter_service(db_session):
-    return RateLimiterService(db=db_session)
+    return RateLimiterService(db=db_session, backend=SqlRateLimitBackend(RateLimiterRepository(db_session)))
+
+
+@pytest.fixture
+def memory_backend():
+    return InMemoryRateLimitBackend(max_keys=2)
 
 
 @pytest.fixture
@@ -43,6 +52,68 @@ def test_should_return_true_when_token_is_rate_limited(rate_limiter_service, sam
     assert is_limited is True
 
 
+def test_should_limit_after_max_requests_when_using_memory_backend(db_session, memory_backend):
+    service = RateLimiterService(db=db_session, backend=memory_backend)
+
+    results = [service.is_rate_limited("memory_token", max_requests=3, period_seconds=10) for _ in range(4)]
+
+    assert results == [False, False, False, True]
+
+
+def test_should_reset_window_when_period_elapsed_in_memory_backend():
+    now = [0.0]
+    backend = InMemoryRateLimitBackend(clock=lambda: now[0])
+
+    for _ in range(3):
+        backend.hit("token", max_requests=3, period_seconds=10)
+    assert backend.hit("token", max_requests=3, period_seconds=10) is True
+
+    now[0] = 11.0
+    assert backend.hit("token", max_requests=3, period_seconds=10) is False
+
+
+def test_should_evict_least_recently_used_token_when_memory_backend_full(memory_backend):
+    memory_backend.hit("token_a", max_requests=1, period_seconds=10)
+    memory_backend.hit("token_b", max_requests=1, period_seconds=10)
+    memory_backend.hit("token_a", max_requests=1, period_seconds=10)
+    memory_backend.hit("token_c", max_requests=1, period_seconds=10)
+
+    assert len(memory_backend) == 2
+    assert memory_backend.hit("token_b", max_requests=1, period_seconds=10) is False
+
+
+def _hit_shared_backend(path, capacity, hits, results):
+    backend = SharedMemoryRateLimitBackend(path, capacity=capacity, slots=16)
+    allowed = sum(1 for _ in range(hits) if not backend.hit("shared_token", max_requests=capacity, period_seconds=60))
+    backend.close()
+    results.put(allowed)
+
+
+def test_should_enforce_single_budget_when_shared_backend_used_by_many_processes(tmp_path):
+    path = str(tmp_path / "rate_limit")
+    capacity, workers, hits = 10, 4, 25
+    SharedMemoryRateLimitBackend(path, capacity=capacity, slots=16).close()
+
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_hit_shared_backend, args=(path, capacity, hits, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    allowed = sum(results.get(timeout=30) for _ in processes)
+    for process in processes:
+        process.join()
+
+    assert allowed == capacity
+
+
+def test_should_keep_tokens_separate_when_using_shared_backend(tmp_path):
+    backend = SharedMemoryRateLimitBackend(str(tmp_path / "rate_limit"), capacity=2, slots=16)
+
+    assert [backend.hit("token_a", max_requests=2, period_seconds=60) for _ in range(3)] == [False, False, True]
+    assert backend.hit("token_b", max_requests=2, period_seconds=60) is False
+    backend.close()
+
+
 def test_should_blacklist_token_when_black_list_success(rate_limiter_service, blacklist_token_service):
     rate_limiter_service.blacklist_token("test_token1")
     assert blacklist_token_service.is_token_blacklisted("test_token1") is True
@@ -55,3 +126,12 @@ def test_should_return_quantity_deleted_when_cleanup_expired_tokens(
     expire_minutes = -10
     response = rate_limiter_service.cleanup_expired_tokens(expire_minutes)
     assert response >= 0  # Số lượng xóa không thể âm
+
+
+def test_should_delete_all_expired_rows_when_cleanup_runs_in_batches(db_session, sample_token_usage):
+    repo = RateLimiterRepository(db_session)
+
+    deleted = repo.delete_expired_tokens(datetime.now(timezone.utc) + timedelta(minutes=1), batch_size=4)
+
+    assert deleted == len(sample_token_usage)
+    assert db_session.query(TokenUsageLog).count() == 0
@@ -0,0 +1,31 @@
+from src.cores.search_index import MODE_BOOLEAN, InvertedIndex, parse_query, tokenize
+
+
+def _index():
+    return InvertedIndex.build(
+        [
+            ("1", "FastAPI tutorial: async routes in FastAPI"),
+            ("2", "SQLAlchemy tutorial"),
+            ("3", "Deploying FastAPI with MySQL"),
+        ]
+    )
+
+
+def test_should_skip_short_tokens_when_tokenizing():
+    assert tokenize("Go to MySQL, an DB") == ["mysql"]
+
+
+def test_should_rank_by_term_frequency_when_natural_mode():
+    scores = _index().search("fastapi")
+
+    assert set(scores) == {"1", "3"}
+    assert scores["1"] > scores["3"]
+
+
+def test_should_apply_required_excluded_and_prefix_terms_when_boolean_mode():
+    index = _index()
+
+    assert set(index.search("+tutorial -sqlalchemy", MODE_BOOLEAN)) == {"1"}
+    assert set(index.search("+fastapi +mysql", MODE_BOOLEAN)) == {"3"}
+    assert set(index.search("sql*", MODE_BOOLEAN)) == {"2"}
+    assert parse_query("+fast* -db", MODE_BOOLEAN)[0].prefix
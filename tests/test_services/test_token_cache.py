@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from src.cores import auth
+from src.cores.token_cache import VerifiedTokenCache
+
+
+def test_should_decode_jwt_once_when_same_token_decoded_twice(mocker):
+    token = auth.create_access_token(username="cached", role="user")
+    decode_spy = mocker.spy(auth.jwt, "decode")
+
+    first = auth.decode_token(token)
+    first["sub"] = "tampered"
+    second = auth.decode_token(token)
+
+    assert decode_spy.call_count == 1
+    assert second["sub"] == "cached"
+
+
+def test_should_not_cache_when_token_invalid_or_expired():
+    expired = auth.create_token({"sub": "old"}, expires_delta=timedelta(seconds=-1))
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            auth.decode_token(expired)
+        assert exc_info.value.detail == "Access token expired"
+        with pytest.raises(HTTPException) as exc_info:
+            auth.decode_token(expired[:-2] + "xx")
+        assert exc_info.value.detail == "Invalid token"
+
+
+def test_should_expire_entry_at_token_exp_and_evict_lru():
+    now = [1000.0]
+    cache = VerifiedTokenCache(max_size=2, clock=lambda: now[0])
+    cache.set(b"a", {"sub": "a", "exp": 1010})
+    cache.set(b"b", {"sub": "b", "exp": 2000})
+
+    assert cache.get(b"a") == {"sub": "a", "exp": 1010}
+    now[0] = 1010
+    assert cache.get(b"a") is None
+
+    cache.set(b"c", {"sub": "c", "exp": 2000})
+    cache.set(b"d", {"sub": "d", "exp": 2000})
+    assert cache.get(b"b") is None
+    assert cache.get(b"d")["sub"] == "d"
@@ -1,7 +1,9 @@
+import asyncio
 from datetime import datetime, timezone
 
 import pytest
 
+from src.cores.buffered_writer import POLICY_DROP, BufferedWriter
 from src.models import User
 from src.models.enums import GenderEnum, RoleEnum
 from src.models.token_logs import TokenLog
@@ -212,3 +214,51 @@ def test_should_return_false_when_no_previous_log(token_log_service):
         action=token_log2.action,
     )
     assert response is False  # No previous log, so it should not be suspicious
+
+
+def test_should_flush_queued_logs_in_batches_when_writer_stops():
+    batches = []
+    writer = BufferedWriter(batches.append, max_size=100, batch_size=2, flush_seconds=60)
+
+    async def scenario():
+        writer.start()
+        for i in range(5):
+            assert writer.submit({"n": i}) is True
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert writer.snapshot() == {"queued": 0, "written": 5, "dropped": 0, "failed": 0}
+
+
+def test_should_drop_log_when_queue_full_and_policy_drop():
+    writer = BufferedWriter(lambda rows: None, max_size=1, batch_size=10, flush_seconds=60, policy=POLICY_DROP)
+
+    async def scenario():
+        writer.start()
+        results = [writer.submit({"n": 1}), writer.submit({"n": 2})]
+        await writer.stop()
+        return results
+
+    assert asyncio.run(scenario()) == [True, False]
+    assert writer.dropped == 1 and writer.written == 1
+
+
+def test_should_insert_log_immediately_when_writer_not_started(db_session):
+    service = TokenLogService(db_session)
+    before = db_session.query(TokenLog).filter(TokenLog.action == "queued").count()
+
+    service.queue_token_request(TokenLogCreate(user_id="user11", username="testuser11", ip_address="10.0.0.1", user_agent="ua", action="queued"))
+
+    assert db_session.query(TokenLog).filter(TokenLog.action == "queued").count() == before + 1
+
+
+def test_should_compare_with_previous_event_without_query_when_fingerprint_cached(token_log_service):
+    log = TokenLogCreate(user_id="user-fp", username="fp", ip_address="10.0.0.1", user_agent="ua-1", action="login")
+    token_log_service.queue_token_request(log)
+    token_log_service.queue_token_request(TokenLogCreate(**{**log.model_dump(), "ip_address": "10.0.0.2"}))
+
+    token_log_service.repo = None  # phát hiện chỉ dựa vào cache
+    assert token_log_service.is_suspicious("user-fp", "10.0.0.2", "ua-1", "login") is True
+    assert token_log_service.is_suspicious("user-fp", "10.0.0.2", "ua-1", "login", current_logged=False) is False
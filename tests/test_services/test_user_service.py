@@ -6,9 +6,14 @@ from fastapi import HTTPException
 from pydantic import ValidationError
 
 from src.cores import auth
+from src.cores.config import settings
+from src.cores.user_cache import CachedUser, UserStatusCache, user_status_cache
+from src.cores.utils import validate_token_and_get_user
 from src.models.users import GenderEnum, RoleEnum, User
-from src.schemas.users import PasswordChangeRequest, UserUpdateRequest
+from src.repositories.user_repository import UserRepository
+from src.schemas.users import PasswordChangeRequest, UserReadAdmin, UserUpdateRequest
 from src.services.user_service import UserService
+from tests.conftest import count_queries, get_test_db
 
 
 # 1. Fixture trả về danh sách user (list)
@@ -411,3 +416,66 @@ def test_should_raise_400_when_update_user_for_email_already_registered(user_ser
     # Kiểm tra nếu email không trùng với user khác thì không raise lỗi
     response = user_service.update_user(user.id, updated_data2)
     assert response.email == user.email
+
+
+def test_should_invalidate_status_cache_when_block_user_for_admin(user_service, mocker, mock_users):
+    user = mock_users[0]
+    user_status_cache.set(CachedUser.from_user(user))
+    mocker.patch.object(user_service.repo, "block_user")
+
+    user_service.block_user_for_admin(user.id)
+
+    assert user_status_cache.get(user.username) is None
+
+
+def test_should_expire_cached_user_when_ttl_elapsed(mock_users):
+    now = [0.0]
+    cache = UserStatusCache(ttl_seconds=30, clock=lambda: now[0])
+    cache.set(CachedUser.from_user(mock_users[0]))
+    assert cache.get(mock_users[0].username) is not None
+
+    now[0] = 31.0
+    assert cache.get(mock_users[0].username) is None
+
+
+def test_should_query_user_once_when_validating_token_twice_in_stateless_mode(mock_users, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_STATELESS", True)
+    user_status_cache.clear()
+    user = mock_users[0]
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = user
+    token = auth.create_access_token(username=user.username, role=user.role)
+
+    first = validate_token_and_get_user(token, db)
+    second = validate_token_and_get_user(token, db)
+
+    assert first == second == CachedUser.from_user(user)
+    assert db.query.call_count == 1
+
+
+def test_should_select_only_schema_columns_when_listing_users_with_schema():
+    db = next(get_test_db())
+    try:
+        with count_queries() as queries:
+            rows = UserRepository(db).get_all(limit=5, schema=UserReadAdmin)
+            UserRepository(db).get_page_after(None, 5, schema=UserReadAdmin)
+    finally:
+        db.close()
+
+    assert queries.count == 2
+    for statement in queries.statements:
+        assert "users.password" not in statement
+        assert "posts" not in statement
+    for row in rows:
+        assert UserReadAdmin.model_validate(row).id == row.id
+
+
+def test_should_revoke_user_tokens_when_admin_blocks_or_deletes_user(user_service, mocker, mock_users):
+    user = mock_users[0]
+    revoke = mocker.patch.object(user_service.blacklist_service, "revoke_user_tokens", return_value=2)
+    mocker.patch.object(user_service.repo, "block_user")
+
+    user_service.block_user_for_admin(user.id)
+    user_service.delete_user(user.id)
+
+    assert revoke.call_args_list == [mocker.call(user.id), mocker.call(user.id)]